@@ -0,0 +1,420 @@
+"""
+Resumable batch generation.
+
+A batch run takes a manifest of variant jobs and generates them on a thread
+pool. Every state change is appended to a JSON-lines journal, and the journal
+is fsynced at checkpoints. When a run is started again with the same journal,
+jobs recorded as done are skipped as long as their output file still has the
+recorded size and SHA-256; everything else is queued again.
+
+Manifest format (JSON list):
+    [{"eep": "demo_appliance.eep", "product": "Smart Thermostat", "version": "1.2.3"}, ...]
+
+Usage:
+    python batch.py --manifest jobs.json [--output-dir output] [--workers 4] [--processes] [--profile]
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from changelog import add_line_to_file, read_lines
+from generator import (CHUNK_SIZE, DEFAULT_CHECKSUMS, GenerationError, VariantJob,
+                       checksum_argument, generate_variant)
+from product_demo_data import id_map
+from profiling import configure as configure_profiling
+from profiling import is_enabled as profiling_enabled
+from profiling import output_dir as profiling_output_dir
+from profiling import profiled
+from shared_image import generate_in_worker
+
+JOURNAL_FILE_NAME: str = "batch_journal.jsonl"
+CHECKPOINT_INTERVAL: int = 20
+
+STATE_STARTED: str = "started"
+STATE_DONE: str = "done"
+STATE_FAILED: str = "failed"
+
+
+def manifest_dir(path: str) -> str:
+    """Directory that the EEP paths of a manifest are relative to."""
+    return os.path.dirname(os.path.abspath(path))
+
+
+def job_key(job: VariantJob, base_dir: str | None = None) -> str:
+    """
+    Stable identifier of a job inside the journal.
+
+    With ``base_dir`` set to the manifest directory, the EEP path is keyed
+    relative to it, so keys do not depend on the checkout location but still
+    tell ``a/fw.eep`` and ``b/fw.eep`` apart.
+    """
+    eep_path: str = os.path.relpath(job.eep_path, base_dir) if base_dir else job.eep_path
+    return json.dumps({**job.to_dict(), "eep_path": eep_path.replace(os.sep, "/")},
+                      sort_keys=True)
+
+
+def load_manifest(path: str, checksums: tuple[str, ...] = DEFAULT_CHECKSUMS) -> list[VariantJob]:
+    """
+    Read a batch manifest.
+
+    EEP paths are resolved relative to the manifest file and product names
+    are mapped to their IDs with ``id_map``.
+
+    Args:
+        path (str): Path to the JSON manifest
+        checksums (tuple[str, ...], optional): Checksums stamped into each file
+
+    Returns:
+        list[VariantJob]: The jobs in manifest order
+
+    Raises:
+        GenerationError: If the manifest cannot be read, contains an invalid entry
+            or two entries write the same output file
+    """
+    try:
+        with open(path) as f:
+            entries: list = json.load(f)
+    except (OSError, ValueError) as e:
+        raise GenerationError(f"Error reading manifest {path}: {e}") from e
+
+    base_dir: str = manifest_dir(path)
+    jobs: list[VariantJob] = []
+    for index, entry in enumerate(entries):
+        try:
+            product: str = entry["product"]
+            if product not in id_map:
+                raise GenerationError(f"Unknown product: {product}")
+            major, minor, revision = (int(part) for part in str(entry["version"]).split("."))
+            jobs.append(VariantJob.from_dict({
+                "eep_path": os.path.join(base_dir, entry["eep"]),
+                "product_id": id_map[product],
+                "major": major, "minor": minor, "revision": revision,
+                "checksums": checksums,
+            }))
+        except (KeyError, TypeError, ValueError, GenerationError) as e:
+            raise GenerationError(f"Invalid manifest entry {index}: {e}") from e
+    check_output_names(jobs)
+    return jobs
+
+
+def check_output_names(jobs: list[VariantJob]) -> None:
+    """
+    Make sure no two distinct jobs write the same output file.
+
+    Raises:
+        GenerationError: If two jobs share an output name, for example the same
+            product and version stamped from ``a/fw.eep`` and ``b/fw.eep``
+    """
+    owners: dict[str, VariantJob] = {}
+    for job in dict.fromkeys(jobs):
+        other: VariantJob | None = owners.setdefault(job.output_name, job)
+        if other is not job:
+            raise GenerationError(
+                f"Jobs for {other.eep_path} and {job.eep_path} both write {job.output_name}.")
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a generated file, recorded in the journal for later verification."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_output(path: str, size: int, digest: str | None) -> bool:
+    """
+    Check that a generated file is still the one recorded in the journal.
+
+    The size is compared first; the file is then hashed again and compared
+    with the SHA-256 recorded when the job finished, so any change to the
+    output is detected. Records without a digest never verify.
+    """
+    if not digest:
+        return False
+    try:
+        return os.path.getsize(path) == size and file_digest(path) == digest
+    except OSError:
+        return False
+
+
+class JobJournal:
+    """
+    Append-only journal of batch job states.
+
+    Records are flushed on every write and fsynced every ``checkpoint_interval``
+    completed jobs and on close. A torn last line, for example after a power
+    cut, is ignored when the journal is loaded.
+    """
+
+    def __init__(self, path: str, checkpoint_interval: int = CHECKPOINT_INTERVAL,
+                 base_dir: str | None = None) -> None:
+        self.path: str = path
+        self.base_dir: str | None = base_dir
+        self._checkpoint_interval: int = checkpoint_interval
+        self._since_checkpoint: int = 0
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self) -> dict[str, dict]:
+        """Return the last recorded state of every job key."""
+        states: dict[str, dict] = {}
+        if not os.path.exists(self.path):
+            return states
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    record: dict = json.loads(line)
+                    states[record["key"]] = record
+                except (ValueError, KeyError):
+                    continue
+        return states
+
+    def open(self) -> None:
+        """Open the journal for appending."""
+        directory: str = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path, "ab+") as f:
+            # Terminate a torn last line so the next record starts on its own line
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        self._file = open(self.path, "a")
+
+    def key(self, job: VariantJob) -> str:
+        """Journal key of a job, relative to the manifest directory if one is set."""
+        return job_key(job, self.base_dir)
+
+    def record(self, job: VariantJob, state: str, **details) -> None:
+        """Append a state change for a job."""
+        entry: dict = {"key": self.key(job), "state": state,
+                       "time": datetime.now().isoformat(timespec="seconds"), **details}
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            if state == STATE_DONE:
+                self._since_checkpoint += 1
+                if self._since_checkpoint >= self._checkpoint_interval:
+                    self._checkpoint()
+
+    def close(self) -> None:
+        """Write a final checkpoint and close the journal."""
+        with self._lock:
+            if self._file is not None:
+                self._checkpoint()
+                self._file.close()
+                self._file = None
+
+    def _checkpoint(self) -> None:
+        """Force the journal to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._since_checkpoint = 0
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a batch run."""
+
+    completed: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+class BatchRunner:
+    """
+    Runs a list of jobs into an output directory, resuming from a journal.
+
+    With ``processes`` enabled the files are generated in worker processes
+    that map each EEP image instead of receiving a copy of it.
+
+    Attributes:
+        output_dir (str): Directory receiving the generated .mot files.
+        journal (JobJournal): Journal of job states for this output directory.
+        log_file (str): ChangeLog file written after each completed job.
+    """
+
+    def __init__(self, project_dir: str, output_dir: str, log_file: str,
+                 journal_path: str | None = None, workers: int = 4,
+                 processes: bool = False, python_writer: bool = False,
+                 base_dir: str | None = None) -> None:
+        self.project_dir: str = project_dir
+        # Recorded output paths must stay valid when resuming from another directory
+        self.output_dir: str = os.path.abspath(output_dir)
+        self.log_file: str = log_file
+        self.journal: JobJournal = JobJournal(
+            journal_path or os.path.join(self.output_dir, JOURNAL_FILE_NAME), base_dir=base_dir)
+        self.workers: int = workers
+        self.processes: bool = processes
+        self.python_writer: bool = python_writer
+        self._process_pool: Executor | None = None
+        self._log_lock = threading.Lock()
+        self._logged: set[str] | None = None
+
+    def pending_jobs(self, jobs: list[VariantJob], result: BatchResult) -> list[VariantJob]:
+        """
+        Drop jobs the journal records as done whose output still verifies.
+
+        A skipped job whose ChangeLog line is missing, because the run stopped
+        between journaling and logging it, gets the line appended now.
+        """
+        states: dict[str, dict] = self.journal.load()
+        pending: list[VariantJob] = []
+        seen: set[VariantJob] = set()
+        for job in jobs:
+            if job in seen:
+                continue
+            seen.add(job)
+            record: dict | None = states.get(self.journal.key(job))
+            if (record is not None and record["state"] == STATE_DONE
+                    and verify_output(record["output_path"], record["size"], record.get("digest"))):
+                result.skipped.append(record["output_path"])
+                if record.get("log_entry"):
+                    self._write_log(record["log_entry"])
+            else:
+                pending.append(job)
+        return pending
+
+    def run(self, jobs: list[VariantJob]) -> BatchResult:
+        """
+        Generate every job that is not already complete.
+
+        Args:
+            jobs (list[VariantJob]): Jobs from the manifest
+
+        Returns:
+            BatchResult: Completed, skipped and failed outputs
+
+        Raises:
+            GenerationError: If two jobs write the same output file
+        """
+        check_output_names(jobs)
+        os.makedirs(self.output_dir, exist_ok=True)
+        result = BatchResult()
+        self._logged = None
+        pending: list[VariantJob] = self.pending_jobs(jobs, result)
+        self.journal.open()
+        if self.processes and pending:
+            # Forking from a process that already runs threads can deadlock workers
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for job, outcome in zip(pending, pool.map(self._run_job, pending)):
+                    if isinstance(outcome, GenerationError):
+                        result.failed[job.output_name] = str(outcome)
+                    else:
+                        result.completed.append(outcome)
+        finally:
+            if self._process_pool is not None:
+                self._process_pool.shutdown()
+                self._process_pool = None
+            self.journal.close()
+        return result
+
+    def _generate(self, job: VariantJob, work_dir: str) -> tuple[str, str]:
+        """Generate one job in this process or hand it to a worker process."""
+        if self._process_pool is None:
+            return self._generate_in_thread(job, work_dir)
+        # Only the job description is pickled; the worker maps the image itself
+        profile_dir: str | None = profiling_output_dir() if profiling_enabled() else None
+        return self._process_pool.submit(
+            generate_in_worker, job, self.project_dir, work_dir,
+            self.python_writer, profile_dir).result()
+
+    # Profiled per job, because cProfile only follows the thread that enabled it
+    @profiled("batch_job")
+    def _generate_in_thread(self, job: VariantJob, work_dir: str) -> tuple[str, str]:
+        """Generate one job on the calling worker thread."""
+        return generate_variant(job, self.project_dir, work_dir,
+                                python_writer=self.python_writer)
+
+    def _run_job(self, job: VariantJob) -> str | GenerationError:
+        """Generate one job and publish its output atomically."""
+        self.journal.record(job, STATE_STARTED)
+        # A work directory inside output_dir keeps the final rename atomic
+        work_dir: str = tempfile.mkdtemp(prefix=".job-", dir=self.output_dir)
+        try:
+            produced, checksum = self._generate(job, work_dir)
+            if not os.path.exists(produced):
+                raise GenerationError("Error: MOT file was not generated.")
+            destination: str = os.path.join(self.output_dir, job.output_name)
+            os.replace(produced, destination)
+            log_entry: str = job.log_entry(checksum)
+            # Journal first: a resumed run appends the line if it never made it to the log
+            self.journal.record(job, STATE_DONE, output_path=destination,
+                                checksum=checksum, size=os.path.getsize(destination),
+                                digest=file_digest(destination), log_entry=log_entry)
+            self._write_log(log_entry)
+            return destination
+        except GenerationError as e:
+            self.journal.record(job, STATE_FAILED, error=str(e))
+            return e
+        except Exception as e:
+            print(f"Exception in batch job {job.output_name}: {traceback.format_exc()}")
+            self.journal.record(job, STATE_FAILED, error=f"Unexpected error: {e}")
+            return GenerationError(f"Unexpected error: {e}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _write_log(self, log_entry: str) -> None:
+        """Append a ChangeLog line unless the log already contains it."""
+        with self._log_lock:
+            if self._logged is None:
+                self._logged = read_lines(self.log_file)
+            if log_entry in self._logged:
+                return
+            if add_line_to_file(self.log_file, log_entry):
+                self._logged.add(log_entry)
+
+
+def main() -> None:
+    """Run a batch from the command line."""
+    project_dir: str = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Resumable batch variant generation")
+    parser.add_argument("--manifest", required=True)
+    parser.add_argument("--output-dir", default=os.path.join(project_dir, "output"))
+    parser.add_argument("--journal", default=None,
+                        help=f"journal file, defaults to <output-dir>/{JOURNAL_FILE_NAME}")
+    parser.add_argument("--log-file", default=os.path.join(project_dir, "ChangeLog.txt"))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true",
+                        help="generate in worker processes sharing a mapped EEP image")
+    parser.add_argument("--checksum", type=checksum_argument, default=DEFAULT_CHECKSUMS)
+    parser.add_argument("--python-writer", action="store_true",
+                        help="write .mot files with the built-in writer instead of the batch file")
+    parser.add_argument("--profile", action="store_true",
+                        help="write cProfile and tracemalloc reports for the run")
+    args = parser.parse_args()
+    configure_profiling(args.profile or profiling_enabled(),
+                        os.path.dirname(os.path.abspath(args.log_file)))
+
+    try:
+        jobs: list[VariantJob] = load_manifest(args.manifest, args.checksum)
+    except GenerationError as e:
+        raise SystemExit(str(e))
+    runner = BatchRunner(project_dir, args.output_dir, args.log_file,
+                         journal_path=args.journal, workers=args.workers,
+                         processes=args.processes, python_writer=args.python_writer,
+                         base_dir=manifest_dir(args.manifest))
+    result: BatchResult = runner.run(jobs)
+    print(f"Completed: {len(result.completed)}, skipped: {len(result.skipped)}, "
+          f"failed: {len(result.failed)}")
+    for name, error in result.failed.items():
+        print(f"Failed {name}: {error}")
+    if result.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
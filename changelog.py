@@ -0,0 +1,49 @@
+"""
+ChangeLog helpers without GUI dependencies.
+
+The batch, sharding and job server entry points run on headless build agents
+where customtkinter and tkinter may not be installed, so they import the
+ChangeLog writer from here rather than from ``function``.
+"""
+
+
+def add_line_to_file(file_name: str, new_line: str) -> bool:
+    """
+    Add a line to the specified file with error handling.
+
+    Args:
+        file_name (str): The name of the file to write to
+        new_line (str): The line to add to the file
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with open(file_name, 'a') as file:
+            file.write(f"{new_line}\n")
+        print(
+            f"Process successfully ended. Added a new line to the file {file_name}")
+        return True
+    except IOError as e:
+        print(f"Error writing to file {file_name}: {e}")
+        return False
+    except Exception as e:
+        print(f"Unexpected error writing to file {file_name}: {e}")
+        return False
+
+
+def read_lines(file_name: str) -> set[str]:
+    """
+    Return the lines already present in a file.
+
+    Args:
+        file_name (str): The file to read
+
+    Returns:
+        set[str]: The lines without line endings, empty if the file does not exist
+    """
+    try:
+        with open(file_name, 'r') as file:
+            return set(file.read().splitlines())
+    except FileNotFoundError:
+        return set()
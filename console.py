@@ -0,0 +1,101 @@
+"""
+Throttled output console for CustomTkinter text boxes.
+
+Rewriting a whole textbox on every status update forces Tk to lay out the
+widget again each time, which becomes the bottleneck once output arrives at
+hundreds of lines per second. ``OutputConsole`` keeps the pending lines in a
+bounded ring buffer, coalesces updates and flushes them to the widget at most
+once per interval, appending only the new lines.
+"""
+import time
+from collections import deque
+
+import customtkinter as ctk
+
+
+class OutputConsole:
+    """
+    Buffered writer in front of a textbox.
+
+    The first update after a quiet period is shown immediately, later updates
+    within the flush interval are collected and written in one go.
+
+    Attributes:
+        FLUSH_INTERVAL_MS (int): Minimum time between two widget updates.
+        MAX_LINES (int): Maximum number of lines kept in the buffer and the widget.
+    """
+
+    FLUSH_INTERVAL_MS: int = 50
+    MAX_LINES: int = 1000
+
+    def __init__(self, widget: ctk.CTkTextbox, max_lines: int = MAX_LINES,
+                 interval_ms: int = FLUSH_INTERVAL_MS) -> None:
+        self._widget: ctk.CTkTextbox = widget
+        self._max_lines: int = max_lines
+        self._interval: float = interval_ms / 1000
+        self._pending: deque[str] = deque(maxlen=max_lines)
+        self._replace: bool = False
+        self._shown_lines: int = 0
+        self._last_flush: float = float("-inf")
+        self._flush_scheduled: bool = False
+
+    def write(self, text: str) -> None:
+        """Append one or more lines to the console."""
+        for line in text.splitlines() or [""]:
+            if len(self._pending) == self._max_lines:
+                # Older pending lines are dropped, so the widget content is stale too
+                self._replace = True
+            self._pending.append(line)
+        self._request_flush()
+
+    def set(self, text: str) -> None:
+        """Replace the console content with the given text."""
+        self._pending.clear()
+        self._replace = True
+        self.write(text)
+
+    def clear(self) -> None:
+        """Remove all content from the console."""
+        self._pending.clear()
+        self._replace = True
+        self._request_flush()
+
+    def flush(self) -> None:
+        """Write the pending changes to the widget now."""
+        self._last_flush = time.monotonic()
+        position: str = "end"
+        if self._replace:
+            self._widget.delete("0.0", "end")
+            self._shown_lines = 0
+            self._replace = False
+            position = "0.0"
+        if not self._pending:
+            return
+        text: str = "\n".join(self._pending)
+        if self._shown_lines:
+            text = f"\n{text}"
+        self._widget.insert(position, text)
+        self._shown_lines += len(self._pending)
+        self._pending.clear()
+
+        excess: int = self._shown_lines - self._max_lines
+        if excess > 0:
+            self._widget.delete("1.0", f"{excess + 1}.0")
+            self._shown_lines = self._max_lines
+
+    def _request_flush(self) -> None:
+        """Flush now if the interval has passed, otherwise schedule one flush."""
+        if self._flush_scheduled:
+            return
+        elapsed: float = time.monotonic() - self._last_flush
+        if elapsed >= self._interval:
+            self.flush()
+            return
+        self._flush_scheduled = True
+        delay_ms: int = max(1, int((self._interval - elapsed) * 1000))
+        self._widget.after(delay_ms, self._scheduled_flush)
+
+    def _scheduled_flush(self) -> None:
+        """Callback for a flush scheduled with ``after``."""
+        self._flush_scheduled = False
+        self.flush()
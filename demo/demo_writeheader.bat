@@ -10,6 +10,7 @@ set id=
 set major=
 set minor=
 set revision=
+set checksum=
 
 :parse_args
 if "%~1"=="" goto execute
@@ -43,6 +44,12 @@ if /i "%~1"=="--revision" (
     shift
     goto parse_args
 )
+if /i "%~1"=="--checksum" (
+    set checksum=%~2
+    shift
+    shift
+    goto parse_args
+)
 shift
 goto parse_args
 
@@ -67,6 +74,7 @@ echo ; Demo MOT file generated from %content%.eep > %output_file%
 echo ; Product ID: %id% >> %output_file%
 echo ; Version: %major%.%minor%.%revision% >> %output_file%
 echo ; Generated: %date% %time% >> %output_file%
+if defined checksum echo ; Checksum: %checksum% >> %output_file%
 echo ; >> %output_file%
 echo ; This is a simulated .mot file for demonstration purposes. >> %output_file%
 echo ; In a real application, this would contain actual firmware data. >> %output_file%
@@ -3,6 +3,8 @@ import tkinter as tk
 import subprocess
 import shlex
 
+from changelog import add_line_to_file  # noqa: F401 - re-exported for the GUI
+
 
 def run_powershell(cmd: str) -> subprocess.CompletedProcess:
     """
@@ -29,31 +31,6 @@ def run_command(command: str) -> None:
     subprocess.call(shlex.split(command))
 
 
-def add_line_to_file(file_name: str, new_line: str) -> bool:
-    """
-    Add a line to the specified file with error handling.
-
-    Args:
-        file_name (str): The name of the file to write to
-        new_line (str): The line to add to the file
-
-    Returns:
-        bool: True if successful, False otherwise
-    """
-    try:
-        with open(file_name, 'a') as file:
-            file.write(f"{new_line}\n")
-        print(
-            f"Process successfully ended. Added a new line to the file {file_name}")
-        return True
-    except IOError as e:
-        print(f"Error writing to file {file_name}: {e}")
-        return False
-    except Exception as e:
-        print(f"Unexpected error writing to file {file_name}: {e}")
-        return False
-
-
 def validate_and_get_input(entry: ctk.CTkEntry, entry_name: str, min_val: int = 0, max_val: int = 99) -> float | None:
     """
     Validate and return the input from a specific entry field.
@@ -0,0 +1,393 @@
+"""
+Headless generation helpers shared by the GUI, the job server and batch runs.
+
+These functions hold the pieces of the .MOT generation that do not depend on
+any widget state, so the same job description can be built from the GUI
+inputs or received over the wire by the local job server.
+"""
+import argparse
+import hashlib
+import os
+import subprocess
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterator
+
+BATCH_FILE_NAME: str = "demo_writeheader.bat"
+OUTPUT_FILE_NAME: str = "demo.mot"
+
+# Checksums that can be stamped into the header, with their hex digest width
+CHECKSUM_WIDTHS: dict[str, int] = {"crc32": 8, "sha256": 64}
+DEFAULT_CHECKSUMS: tuple[str, ...] = ("crc32",)
+
+CHUNK_SIZE: int = 64 * 1024
+RECORD_SIZE: int = 32
+
+
+class GenerationError(Exception):
+    """Raised when a variant file could not be generated."""
+
+
+@dataclass(frozen=True)
+class VariantJob:
+    """
+    Description of a single variant generation.
+
+    Instances are immutable and hashable, so two identical requests compare
+    equal and can be deduplicated by the job server.
+
+    Attributes:
+        eep_path (str): Absolute path to the source EEP file.
+        product_id (int): Product ID stamped into the header.
+        major (int): Major version number.
+        minor (int): Minor version number.
+        revision (int): Revision number.
+        checksums (tuple[str, ...]): Checksums stamped into the header.
+    """
+
+    eep_path: str
+    product_id: int
+    major: int
+    minor: int
+    revision: int
+    checksums: tuple[str, ...] = DEFAULT_CHECKSUMS
+
+    def __post_init__(self) -> None:
+        if not self.checksums:
+            raise GenerationError(
+                f"At least one checksum is required. Choose from {', '.join(CHECKSUM_WIDTHS)}.")
+        unknown: list[str] = [name for name in self.checksums
+                              if name not in CHECKSUM_WIDTHS]
+        if unknown:
+            raise GenerationError(
+                f"Unsupported checksum: {', '.join(unknown)}. Choose from {', '.join(CHECKSUM_WIDTHS)}.")
+
+    @property
+    def content(self) -> str:
+        """Base name of the EEP file without extension."""
+        return os.path.splitext(os.path.basename(self.eep_path))[0]
+
+    @property
+    def version(self) -> str:
+        """Version string in ``major.minor.revision`` form."""
+        return f"{self.major}.{self.minor}.{self.revision}"
+
+    @property
+    def output_name(self) -> str:
+        """
+        Unique file name for the generated .mot file of this variant.
+
+        Non-default checksum sets are part of the name, because they produce a
+        different header for the same product and version.
+        """
+        suffix: str = "" if self.checksums == DEFAULT_CHECKSUMS else f"_{'-'.join(self.checksums)}"
+        return f"{self.content}_{self.product_id}_v{self.version}{suffix}.mot"
+
+    def writeheader_args(self) -> str:
+        """Command line arguments passed to the writeheader batch file."""
+        return (f"--content {self.content} --id {self.product_id} "
+                f"--major {self.major} --minor {self.minor} --revision {self.revision}")
+
+    def log_entry(self, checksum: str | None = None) -> str:
+        """ChangeLog line recorded after a successful generation."""
+        entry: str = f"Created .mot file | {date.today()} | demo_writeheader {self.writeheader_args()}"
+        if checksum:
+            entry += f' --checksum "{checksum}"'
+        return entry
+
+    def to_dict(self) -> dict:
+        """Serialize the job into a JSON-compatible dictionary."""
+        return {
+            "eep_path": self.eep_path,
+            "product_id": self.product_id,
+            "major": self.major,
+            "minor": self.minor,
+            "revision": self.revision,
+            "checksums": list(self.checksums),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "VariantJob":
+        """
+        Build a job from a dictionary produced by ``to_dict``.
+
+        Raises:
+            GenerationError: If a field is missing or has an invalid value
+        """
+        try:
+            job = cls(
+                eep_path=os.path.abspath(str(data["eep_path"])),
+                product_id=int(data["product_id"]),
+                major=int(data["major"]),
+                minor=int(data["minor"]),
+                revision=int(data["revision"]),
+                checksums=tuple(data.get("checksums", DEFAULT_CHECKSUMS)),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise GenerationError(f"Invalid job description: {e}") from e
+        for name in ("major", "minor", "revision"):
+            if not 0 <= getattr(job, name) <= 99:
+                raise GenerationError(
+                    f"{name.capitalize()} must be between 0 and 99.")
+        return job
+
+
+def parse_checksums(value: str) -> tuple[str, ...]:
+    """
+    Parse a comma separated checksum list such as ``crc32,sha256``.
+
+    Raises:
+        GenerationError: If the list is empty or names an unsupported checksum
+    """
+    names: tuple[str, ...] = tuple(
+        name.strip().lower() for name in value.split(",") if name.strip())
+    unknown: list[str] = [name for name in names if name not in CHECKSUM_WIDTHS]
+    if not names or unknown:
+        raise GenerationError(
+            f"Unsupported checksum: {', '.join(unknown) or value!r}. Choose from {', '.join(CHECKSUM_WIDTHS)}.")
+    return names
+
+
+def checksum_argument(value: str) -> tuple[str, ...]:
+    """argparse ``type`` for ``--checksum`` options."""
+    try:
+        return parse_checksums(value)
+    except GenerationError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+
+class ImageChecksum:
+    """
+    Incremental CRC32/SHA-256 over an image payload.
+
+    The checksums are updated chunk by chunk while the payload is streamed,
+    so no separate pass over the data is needed.
+    """
+
+    def __init__(self, algorithms: tuple[str, ...] = DEFAULT_CHECKSUMS) -> None:
+        self.algorithms: tuple[str, ...] = algorithms
+        self._crc32: int = 0
+        self._sha256 = hashlib.sha256() if "sha256" in algorithms else None
+
+    def update(self, chunk: bytes | memoryview) -> None:
+        """Add the next chunk of payload to the checksums."""
+        if "crc32" in self.algorithms:
+            self._crc32 = zlib.crc32(chunk, self._crc32)
+        if self._sha256 is not None:
+            self._sha256.update(chunk)
+
+    def hexdigest(self, algorithm: str) -> str:
+        """Return the upper case hex digest of one algorithm."""
+        if algorithm == "crc32":
+            return f"{self._crc32:08X}"
+        return self._sha256.hexdigest().upper()
+
+    def format(self) -> str:
+        """Header/ChangeLog representation, e.g. ``crc32:1A2B3C4D``."""
+        return " ".join(f"{name}:{self.hexdigest(name)}" for name in self.algorithms)
+
+    @staticmethod
+    def placeholder(algorithms: tuple[str, ...]) -> str:
+        """Fixed width placeholder reserving header space for ``format``."""
+        return " ".join(f"{name}:{'0' * CHECKSUM_WIDTHS[name]}" for name in algorithms)
+
+
+def _payload_chunks(path: str, payload: memoryview | None = None) -> Iterator[memoryview]:
+    """
+    Yield the payload in chunks of at most ``CHUNK_SIZE`` bytes.
+
+    With a ``payload`` buffer the chunks are zero-copy slices of it, otherwise
+    the file is read into one reused buffer, so each chunk is only valid until
+    the next one is requested.
+    """
+    if payload is not None:
+        for offset in range(0, len(payload), CHUNK_SIZE):
+            yield payload[offset:offset + CHUNK_SIZE]
+        return
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb") as f:
+        while read := f.readinto(buffer):
+            yield view[:read]
+
+
+def checksum_file(path: str, algorithms: tuple[str, ...] = DEFAULT_CHECKSUMS,
+                  payload: memoryview | None = None) -> ImageChecksum:
+    """
+    Compute the checksums of a file in a single streaming pass.
+
+    Args:
+        path (str): File to read
+        algorithms (tuple[str, ...], optional): Checksums to compute
+        payload (memoryview | None, optional): Already mapped file content
+
+    Returns:
+        ImageChecksum: The finished checksums
+    """
+    checksum = ImageChecksum(algorithms)
+    for chunk in _payload_chunks(path, payload):
+        checksum.update(chunk)
+    return checksum
+
+
+def _srecord(record_type: str, address: bytes, data: bytes | memoryview = b"") -> str:
+    """Encode one Motorola S-record line."""
+    body: bytes = bytes([len(address) + len(data) + 1]) + address + bytes(data)
+    return f"{record_type}{body.hex().upper()}{0xFF - (sum(body) & 0xFF):02X}\n"
+
+
+def write_mot_file(job: VariantJob, out_path: str, payload: memoryview | None = None) -> ImageChecksum:
+    """
+    Write a .mot file for a job, streaming the EEP payload as S3 records.
+
+    This is the Python counterpart of ``demo_writeheader.bat`` and writes the
+    same header lines. The checksum line is reserved with a fixed width
+    placeholder and filled in once the payload has been streamed, so the
+    payload is read exactly once.
+
+    Args:
+        job (VariantJob): The variant to generate
+        out_path (str): Destination .mot file
+        payload (memoryview | None, optional): Already mapped EEP content,
+            read instead of the file without copying it
+
+    Returns:
+        ImageChecksum: Checksums of the streamed payload
+
+    Raises:
+        GenerationError: If the EEP file cannot be read or the output written
+    """
+    checksum = ImageChecksum(job.checksums)
+    try:
+        with open(out_path, "wb") as out:
+            header: str = (f"; Demo MOT file generated from {job.content}.eep\n"
+                           f"; Product ID: {job.product_id}\n"
+                           f"; Version: {job.version}\n"
+                           f"; Generated: {datetime.now():%Y-%m-%d %H:%M:%S}\n")
+            out.write(header.encode("ascii", "replace"))
+            checksum_offset: int = out.tell()
+            out.write(f"; Checksum: {ImageChecksum.placeholder(job.checksums)}\n;\n".encode("ascii"))
+            out.write(_srecord("S0", b"\x00\x00", job.content.encode("ascii", "replace")).encode("ascii"))
+
+            address: int = 0
+            for chunk in _payload_chunks(job.eep_path, payload):
+                checksum.update(chunk)
+                lines: list[str] = [
+                    _srecord("S3", (address + offset).to_bytes(4, "big"),
+                             chunk[offset:offset + RECORD_SIZE])
+                    for offset in range(0, len(chunk), RECORD_SIZE)]
+                out.write("".join(lines).encode("ascii"))
+                address += len(chunk)
+            out.write(_srecord("S7", b"\x00\x00\x00\x00").encode("ascii"))
+
+            out.seek(checksum_offset)
+            out.write(f"; Checksum: {checksum.format()}".encode("ascii"))
+    except (OSError, UnicodeError) as e:
+        # Do not leave a truncated file behind for the caller to pick up
+        try:
+            os.remove(out_path)
+        except OSError:
+            pass
+        raise GenerationError(f"Error writing {out_path}: {e}") from e
+    return checksum
+
+
+def find_batch_file(project_dir: str) -> str | None:
+    """
+    Locate the writeheader batch file.
+
+    Looks next to the exe/script first and then in the demo subfolder
+    used during development.
+
+    Args:
+        project_dir (str): Directory of the running script or executable
+
+    Returns:
+        str | None: Path to the batch file, or None if it was not found
+    """
+    for candidate in (os.path.join(project_dir, BATCH_FILE_NAME),
+                      os.path.join(project_dir, "demo", BATCH_FILE_NAME)):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def build_command(batch_file: str, job: VariantJob, checksum: str | None = None) -> str:
+    """Build the shell command that runs the writeheader batch file for a job."""
+    command: str = f'cmd /c "{batch_file}" {job.writeheader_args()}'
+    if checksum:
+        command += f' --checksum "{checksum}"'
+    return command
+
+
+def run_writeheader(batch_file: str, job: VariantJob, cwd: str | None = None,
+                    checksum: str | None = None) -> subprocess.CompletedProcess:
+    """
+    Run the writeheader batch file for a job.
+
+    The batch file always writes ``demo.mot`` into its working directory, so
+    callers running several jobs at once should give each one its own ``cwd``.
+
+    Args:
+        batch_file (str): Path to the writeheader batch file
+        job (VariantJob): The variant to generate
+        cwd (str | None, optional): Working directory for the batch file
+        checksum (str | None, optional): Checksum text for the header field
+
+    Returns:
+        subprocess.CompletedProcess: The completed batch file process
+
+    Raises:
+        GenerationError: If the batch file fails or cannot run on this platform
+    """
+    if os.name != 'nt':
+        raise GenerationError(
+            "The writeheader batch file can only be executed on Windows.")
+    command: str = build_command(batch_file, job, checksum)
+    print(f"Executing command: {command}")
+    try:
+        return subprocess.run(command, shell=True, check=True,
+                              capture_output=True, text=True, cwd=cwd)
+    except subprocess.CalledProcessError as e:
+        raise GenerationError(f"Error executing command: {e.stderr}") from e
+
+
+def generate_variant(job: VariantJob, project_dir: str, work_dir: str,
+                     payload: memoryview | None = None,
+                     python_writer: bool = False) -> tuple[str, str]:
+    """
+    Generate the .mot file for a job in ``work_dir``.
+
+    On Windows the writeheader batch file is used; the payload checksum is
+    computed in one streaming pass and handed to the batch file for its
+    header. On other systems, or when ``python_writer`` is set, the .mot file
+    is written by ``write_mot_file``, which checksums the payload while
+    streaming it.
+
+    Args:
+        job (VariantJob): The variant to generate
+        project_dir (str): Directory used to look up the batch file
+        work_dir (str): Directory receiving ``demo.mot``
+        payload (memoryview | None, optional): Already mapped EEP content
+        python_writer (bool, optional): Use ``write_mot_file`` on Windows too
+
+    Returns:
+        tuple[str, str]: Path of the generated file and its checksum text
+
+    Raises:
+        GenerationError: If the file could not be generated
+    """
+    out_path: str = os.path.join(work_dir, OUTPUT_FILE_NAME)
+    if os.name == 'nt' and not python_writer:
+        batch_file: str | None = find_batch_file(project_dir)
+        if batch_file is None:
+            raise GenerationError(
+                f"Error: Batch file not found. Searched in:\n- {project_dir}\n- {os.path.join(project_dir, 'demo')}")
+        try:
+            checksum: str = checksum_file(job.eep_path, job.checksums, payload).format()
+        except OSError as e:
+            raise GenerationError(f"Error reading {job.eep_path}: {e}") from e
+        run_writeheader(batch_file, job, cwd=work_dir, checksum=checksum)
+        return out_path, checksum
+    return out_path, write_mot_file(job, out_path, payload).format()
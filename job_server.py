@@ -0,0 +1,394 @@
+"""
+Local job server for shared variant generation.
+
+Several GUI instances on the same machine can submit their generation jobs to
+one server instead of each generating the files themselves. The
+server keeps a priority queue, deduplicates identical in-flight requests and
+runs jobs on a small worker pool. Every job runs in its own working directory,
+so concurrent jobs no longer overwrite each other's ``demo.mot``, and the
+server is the only writer of ``ChangeLog.txt``.
+
+The GUI talks to the server through ``submit_job`` and ``get_job_status``.
+Both return None when no server is reachable, which lets the GUI fall back
+to standalone generation.
+
+Usage:
+    python job_server.py [--host 127.0.0.1] [--port 8765] [--workers 2] [--profile]
+"""
+import argparse
+import itertools
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import traceback
+import urllib.error
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from changelog import add_line_to_file
+from generator import GenerationError, VariantJob, generate_variant
+from profiling import configure as configure_profiling
+from profiling import is_enabled as profiling_enabled
+from profiling import profiled
+
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8765
+DEFAULT_PRIORITY: int = 10
+CLIENT_TIMEOUT: float = 0.5
+# Finished jobs stay available for status polls this long, up to a maximum count
+FINISHED_JOB_TTL: float = 600.0
+MAX_FINISHED_JOBS: int = 1000
+
+STATUS_QUEUED: str = "queued"
+STATUS_RUNNING: str = "running"
+STATUS_DONE: str = "done"
+STATUS_FAILED: str = "failed"
+
+# Runs one job inside the given working directory and returns the produced .mot file and its checksum
+JobRunner = Callable[[VariantJob, str], tuple[str, str]]
+
+
+class Job:
+    """
+    A job tracked by the server.
+
+    Attributes:
+        job_id (str): Unique identifier returned to clients.
+        spec (VariantJob): The variant to generate.
+        priority (int): Lower values are processed first.
+        status (str): One of queued, running, done or failed.
+        output_path (str | None): Location of the generated file once done.
+        checksum (str | None): Checksum stamped into the generated file.
+        error (str | None): Error message if the job failed.
+    """
+
+    def __init__(self, spec: VariantJob, priority: int) -> None:
+        self.job_id: str = uuid.uuid4().hex
+        self.spec: VariantJob = spec
+        self.priority: int = priority
+        self.status: str = STATUS_QUEUED
+        self.output_path: str | None = None
+        self.checksum: str | None = None
+        self.error: str | None = None
+
+    def to_dict(self) -> dict:
+        """Serialize the job status for the HTTP API."""
+        return {
+            "id": self.job_id,
+            "status": self.status,
+            "priority": self.priority,
+            "job": self.spec.to_dict(),
+            "output_path": self.output_path,
+            "checksum": self.checksum,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Thread-safe priority queue that deduplicates identical in-flight jobs.
+
+    Submitting a job equal to one that is still queued or running returns the
+    existing job instead of scheduling the work twice. Finished jobs can be
+    polled for ``finished_ttl`` seconds; after that, or once more than
+    ``max_finished`` jobs have finished, the oldest ones are forgotten.
+    """
+
+    def __init__(self, finished_ttl: float = FINISHED_JOB_TTL,
+                 max_finished: int = MAX_FINISHED_JOBS) -> None:
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+        self._in_flight: dict[VariantJob, Job] = {}
+        # Finish times of finished jobs, oldest first
+        self._finished: dict[str, float] = {}
+        self._finished_ttl: float = finished_ttl
+        self._max_finished: int = max_finished
+
+    def submit(self, spec: VariantJob, priority: int = DEFAULT_PRIORITY) -> Job:
+        """Queue a job, or return the matching in-flight job if there is one."""
+        with self._lock:
+            self._expire()
+            existing: Job | None = self._in_flight.get(spec)
+            if existing is not None:
+                return existing
+            job = Job(spec, priority)
+            self._jobs[job.job_id] = job
+            self._in_flight[spec] = job
+            # The counter keeps equal priorities in FIFO order
+            self._queue.put((priority, next(self._counter), job.job_id))
+            return job
+
+    def next_job(self, timeout: float | None = None) -> Job | None:
+        """
+        Take the highest priority job and mark it as running.
+
+        Returns:
+            Job | None: The job to run, or None if the timeout expired
+        """
+        try:
+            _, _, job_id = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self._lock:
+            job: Job = self._jobs[job_id]
+            job.status = STATUS_RUNNING
+            return job
+
+    def finish(self, job: Job, output_path: str | None = None,
+               checksum: str | None = None, error: str | None = None) -> None:
+        """Record the outcome of a job and release its deduplication slot."""
+        with self._lock:
+            job.output_path = output_path
+            job.checksum = checksum
+            job.error = error
+            job.status = STATUS_FAILED if error else STATUS_DONE
+            self._in_flight.pop(job.spec, None)
+            self._finished[job.job_id] = time.monotonic()
+            self._expire()
+
+    def get(self, job_id: str) -> Job | None:
+        """Look up a job by its identifier."""
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def _expire(self) -> None:
+        """Forget finished jobs past their TTL or beyond the cap. Caller holds the lock."""
+        cutoff: float = time.monotonic() - self._finished_ttl
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > cutoff and len(self._finished) <= self._max_finished:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+
+class JobServer:
+    """
+    HTTP job server on localhost backed by a ``JobQueue`` and a worker pool.
+
+    Attributes:
+        jobs (JobQueue): Queue shared by the HTTP handler and the workers.
+        output_dir (str): Directory receiving the generated .mot files.
+        log_file (str): ChangeLog file written after each successful job.
+    """
+
+    def __init__(self, project_dir: str, output_dir: str, log_file: str,
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 workers: int = 2, runner: JobRunner | None = None,
+                 python_writer: bool = False) -> None:
+        self.project_dir: str = project_dir
+        self.output_dir: str = output_dir
+        self.log_file: str = log_file
+        self.jobs: JobQueue = JobQueue()
+        self._runner: JobRunner = runner or self._generate
+        self._python_writer: bool = python_writer
+        self._worker_count: int = workers
+        self._workers: list[threading.Thread] = []
+        self._log_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._serving: bool = False
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self.jobs))
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Host and port the server is listening on."""
+        host, port = self._httpd.server_address[:2]
+        return host, port
+
+    def start(self) -> None:
+        """Start the worker pool and serve HTTP requests in a background thread."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        for index in range(self._worker_count):
+            worker = threading.Thread(
+                target=self._work, name=f"job-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        threading.Thread(target=self._httpd.serve_forever,
+                         name="job-http", daemon=True).start()
+        self._serving = True
+
+    def stop(self) -> None:
+        """Stop serving requests and wait for the workers to exit."""
+        self._stopping.set()
+        if self._serving:
+            self._httpd.shutdown()
+            self._serving = False
+        self._httpd.server_close()
+        for worker in self._workers:
+            worker.join()
+        self._workers.clear()
+
+    def _work(self) -> None:
+        """Worker loop: take jobs from the queue until the server stops."""
+        while not self._stopping.is_set():
+            job: Job | None = self.jobs.next_job(timeout=0.2)
+            if job is None:
+                continue
+            try:
+                self._process(job)
+            except Exception as e:
+                # Keep the worker alive and release the job's dedup slot
+                self.jobs.finish(job, error=f"Unexpected error: {e}")
+                print(f"Exception in job {job.job_id}: {traceback.format_exc()}")
+
+    @profiled("job")
+    def _process(self, job: Job) -> None:
+        """Run one job in a private working directory and publish its output."""
+        work_dir: str = tempfile.mkdtemp(prefix="variant-job-")
+        try:
+            produced, checksum = self._runner(job.spec, work_dir)
+            if not os.path.exists(produced):
+                raise GenerationError("Error: MOT file was not generated.")
+            destination: str = os.path.join(self.output_dir, job.spec.output_name)
+            shutil.move(produced, destination)
+            with self._log_lock:
+                add_line_to_file(self.log_file, job.spec.log_entry(checksum))
+            self.jobs.finish(job, output_path=destination, checksum=checksum)
+        except GenerationError as e:
+            self.jobs.finish(job, error=str(e))
+        except Exception as e:
+            self.jobs.finish(job, error=f"Unexpected error: {e}")
+            print(f"Exception in job {job.job_id}: {traceback.format_exc()}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _generate(self, spec: VariantJob, work_dir: str) -> tuple[str, str]:
+        """Default runner generating the .mot file in the job's working directory."""
+        return generate_variant(spec, self.project_dir, work_dir,
+                                python_writer=self._python_writer)
+
+
+def _make_handler(jobs: JobQueue) -> type[BaseHTTPRequestHandler]:
+    """Create the request handler class bound to a job queue."""
+
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        """Minimal JSON API: POST /jobs, GET /jobs/<id> and GET /health."""
+
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                self._send(200, {"status": "ok"})
+                return
+            if self.path.startswith("/jobs/"):
+                job: Job | None = jobs.get(self.path[len("/jobs/"):])
+                if job is None:
+                    self._send(404, {"error": "Unknown job."})
+                else:
+                    self._send(200, job.to_dict())
+                return
+            self._send(404, {"error": "Not found."})
+
+        def do_POST(self) -> None:
+            if self.path != "/jobs":
+                self._send(404, {"error": "Not found."})
+                return
+            try:
+                length: int = int(self.headers.get("Content-Length", 0))
+                data: dict = json.loads(self.rfile.read(length) or b"{}")
+                spec: VariantJob = VariantJob.from_dict(data)
+                priority: int = int(data.get("priority", DEFAULT_PRIORITY))
+            except (GenerationError, ValueError, TypeError, AttributeError) as e:
+                self._send(400, {"error": str(e)})
+                return
+            self._send(202, jobs.submit(spec, priority).to_dict())
+
+        def _send(self, code: int, body: dict) -> None:
+            payload: bytes = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args) -> None:
+            # Keep the console quiet while the GUI polls for status
+            pass
+
+    return JobRequestHandler
+
+
+def _request(method: str, path: str, body: dict | None, host: str, port: int) -> dict | None:
+    """Send a JSON request to the job server, returning None if it is unreachable."""
+    data: bytes | None = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(
+        f"http://{host}:{port}{path}", data=data, method=method,
+        headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=CLIENT_TIMEOUT) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            return json.loads(e.read())
+        except ValueError:
+            return {"error": f"HTTP {e.code}"}
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def submit_job(spec: VariantJob, priority: int = DEFAULT_PRIORITY,
+               host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> dict | None:
+    """
+    Submit a job to a running job server.
+
+    Args:
+        spec (VariantJob): The variant to generate
+        priority (int, optional): Lower values run first. Defaults to 10
+        host (str, optional): Server host. Defaults to 127.0.0.1
+        port (int, optional): Server port. Defaults to 8765
+
+    Returns:
+        dict | None: The job status, or None if no server is running
+    """
+    return _request("POST", "/jobs", {**spec.to_dict(), "priority": priority}, host, port)
+
+
+def get_job_status(job_id: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> dict | None:
+    """
+    Fetch the status of a submitted job.
+
+    Returns:
+        dict | None: The job status, or None if the server is unreachable
+    """
+    return _request("GET", f"/jobs/{job_id}", None, host, port)
+
+
+def main() -> None:
+    """Run the job server until interrupted."""
+    project_dir: str = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Local variant generation job server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--output-dir", default=os.path.join(project_dir, "output"))
+    parser.add_argument("--log-file", default=os.path.join(project_dir, "ChangeLog.txt"))
+    parser.add_argument("--profile", action="store_true",
+                        help="write cProfile and tracemalloc reports for each job")
+    parser.add_argument("--python-writer", action="store_true",
+                        help="write .mot files with the built-in writer instead of the batch file")
+    args = parser.parse_args()
+    configure_profiling(args.profile or profiling_enabled(),
+                        os.path.dirname(os.path.abspath(args.log_file)))
+
+    server = JobServer(project_dir, args.output_dir, args.log_file,
+                       host=args.host, port=args.port, workers=args.workers,
+                       python_writer=args.python_writer)
+    server.start()
+    print(f"Job server listening on http://{args.host}:{args.port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("Stopping job server ...")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
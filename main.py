@@ -1,13 +1,20 @@
+import argparse
 import os
 import subprocess
 import sys
 import traceback
-from datetime import date
 from tkinter import filedialog
 
 import customtkinter as ctk
+from console import OutputConsole
 from function import add_line_to_file
+from generator import (DEFAULT_CHECKSUMS, GenerationError, VariantJob,
+                       checksum_argument, generate_variant)
+from job_server import STATUS_DONE, STATUS_FAILED, get_job_status, submit_job
 from product_demo_data import id_map, product_names
+from profiling import configure as configure_profiling
+from profiling import is_enabled as profiling_enabled
+from profiling import profiled
 
 
 class VariantGeneratorDemoApp(ctk.CTk):
@@ -30,6 +37,9 @@ class VariantGeneratorDemoApp(ctk.CTk):
     ctk.set_default_color_theme("blue")
 
     LOG_FILE_NAME: str = 'ChangeLog.txt'
+    JOB_POLL_INTERVAL_MS: int = 500
+    checksum_algorithms: tuple[str, ...] = DEFAULT_CHECKSUMS
+    use_python_writer: bool = False
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -57,10 +67,14 @@ class VariantGeneratorDemoApp(ctk.CTk):
         self.minor_entry: ctk.CTkEntry | None = None
         self.revision_entry: ctk.CTkEntry | None = None
         self.display_box: ctk.CTkTextbox | None = None
+        self.console: OutputConsole | None = None
         self.button_open_file: ctk.CTkButton | None = None
 
         self.create_widgets()
 
+        # Hidden toggle for capturing profiles on an operator's machine
+        self.bind("<Control-Shift-P>", self.toggle_profiling)
+
     def _set_violet_theme(self) -> None:
         """Apply modern violet/purple color theme to the application."""
         # Modern AI-inspired violet color palette
@@ -102,6 +116,7 @@ class VariantGeneratorDemoApp(ctk.CTk):
         self.display_box = ctk.CTkTextbox(self, width=400, height=60)
         self.display_box.grid(row=6, column=0, columnspan=6,
                               padx=20, pady=20, sticky="nsew")
+        self.console = OutputConsole(self.display_box)
 
         # Open File Button (Initially Disabled)
         self.button_open_file = ctk.CTkButton(
@@ -122,19 +137,17 @@ class VariantGeneratorDemoApp(ctk.CTk):
     def generate_location(self) -> None:
         """Prompts the user to select an EEP file and updates the UI accordingly."""
         try:
-            self.display_box.delete("0.0", "end")
+            self.console.clear()
             file_path: str = filedialog.askopenfilename(
                 filetypes=[("EEP Files", "*.eep"), ("All Files", "*.*")])
             if not file_path:
-                self.display_box.delete("0.0", "end")
-                self.display_box.insert("0.0", "No file selected.")
+                self.console.set("No file selected.")
                 return
             if file_path.endswith(".eep"):
                 self.eep_file_name = file_path
                 self.location_box.delete("0.0", "end")
                 self.location_box.insert("0.0", os.path.basename(file_path))
-                self.display_box.delete("0.0", "end")
-                self.display_box.insert("0.0", "File selected successfully.")
+                self.console.set("File selected successfully.")
             else:
                 self.eep_file_name = None
                 self.display_error("Error: Please select a valid .eep file.")
@@ -142,18 +155,26 @@ class VariantGeneratorDemoApp(ctk.CTk):
             self.display_error(f"Error selecting file: {e}")
             print(f"Exception in generate_location: {traceback.format_exc()}")
 
+    def toggle_profiling(self, event=None) -> None:
+        """Turns profiling of generate_results on or off."""
+        enabled: bool = not profiling_enabled()
+        configure_profiling(
+            enabled, os.path.dirname(os.path.abspath(self.LOG_FILE_NAME)))
+        self.console.set(f"Profiling {'enabled' if enabled else 'disabled'}.")
+
+    @profiled("generate_results")
     def generate_results(self) -> None:
         """Processes the selected EEP file to generate a .MOT file based on user inputs."""
         try:
-            self.display_box.delete("0.0", "end")
+            self.console.clear()
 
             if not self.eep_file_name or not self.eep_file_name.endswith(".eep"):
                 self.display_error(
                     "Error: Please select a valid .eep file before proceeding.")
                 return
 
-            self.display_box.delete("0.0", "end")
-            self.display_box.insert("0.0", "Process is running ...")
+            self.console.set("Process is running ...")
+            self.console.flush()
             self.display_box.update_idletasks()
 
             major, minor, revision = map(
@@ -161,62 +182,65 @@ class VariantGeneratorDemoApp(ctk.CTk):
             if None in [major, minor, revision]:
                 return
 
-            major_int: int = int(major)
-            minor_int: int = int(minor)
-            revision_int: int = int(revision)
-
-            eep_base_name: str = os.path.splitext(
-                os.path.basename(self.eep_file_name))[0]
-            product_id: int = id_map.get(self.variant_option_menu.get(), 0)
+            job: VariantJob = VariantJob(
+                eep_path=os.path.abspath(self.eep_file_name),
+                product_id=id_map.get(self.variant_option_menu.get(), 0),
+                major=int(major), minor=int(minor), revision=int(revision),
+                checksums=self.checksum_algorithms)
 
-            # Look for batch file in multiple locations
-            # First, check in the same directory as exe/script
-            batch_file: str = os.path.join(
-                self.project_dir, "demo_writeheader.bat")
-
-            # If not found, check in demo subfolder (for development)
-            if not os.path.exists(batch_file):
-                batch_file = os.path.join(
-                    self.project_dir, "demo", "demo_writeheader.bat")
+            # Hand the job to a local job server if one is running
+            status: dict | None = submit_job(job)
+            if status is not None:
+                self._handle_job_status(status)
+                return
 
-            if not os.path.exists(batch_file):
-                self.display_error(
-                    f"Error: Batch file not found. Searched in:\n- {self.project_dir}\n- {os.path.join(self.project_dir, 'demo')}")
+            try:
+                mot_path, checksum = generate_variant(
+                    job, self.project_dir, self.project_dir,
+                    python_writer=self.use_python_writer)
+            except GenerationError as e:
+                self.display_error(str(e))
                 return
 
-            batch_file_name: str = os.path.basename(batch_file)
-            command: str = f'cmd /c "{batch_file}" --content {eep_base_name} --id {product_id} --major {major_int} --minor {minor_int} --revision {revision_int}'
-            print(f"Executing command: {command}")
+            add_line_to_file(self.LOG_FILE_NAME, job.log_entry(checksum))
 
-            if os.name == 'nt':
-                try:
-                    result: subprocess.CompletedProcess = subprocess.run(
-                        command, shell=True, check=True, capture_output=True, text=True)
-                    self.display_box.delete("0.0", "end")
-                    self.display_box.insert(
-                        "0.0", "Command executed successfully.")
-                except subprocess.CalledProcessError as e:
-                    self.display_error(f"Error executing command: {e.stderr}")
-                    return
-
-            log_entry: str = f"Created .mot file | {date.today()} | demo_writeheader --content {eep_base_name} --id {product_id} --major {major_int} --minor {minor_int} --revision {revision_int}"
-            add_line_to_file(self.LOG_FILE_NAME, log_entry)
-
-            expected_mot_file: str = os.path.join(self.project_dir, "demo.mot")
-            if os.path.exists(expected_mot_file):
-                self.generated_mot_path = expected_mot_file
-                self.display_box.delete("0.0", "end")
-                self.display_box.insert(
-                    "0.0", "✓ Operation completed successfully: .mot file has been created.\n\nClick the button below to open the file.")
-                self.button_open_file.configure(
-                    state="normal", fg_color="#10b981", hover_color="#059669",
-                    text="✓ Open Created File", font=("", 13, "bold"))
+            if os.path.exists(mot_path):
+                self.show_generated_file(mot_path)
             else:
                 self.display_error("Error: MOT file was not generated.")
         except Exception as e:
             self.display_error(f"Unexpected error: {e}")
             print(f"Exception in generate_results: {traceback.format_exc()}")
 
+    def show_generated_file(self, mot_path: str) -> None:
+        """Reports a successful generation and enables the open file button."""
+        self.generated_mot_path = mot_path
+        self.console.set(
+            "✓ Operation completed successfully: .mot file has been created.\n\nClick the button below to open the file.")
+        self.button_open_file.configure(
+            state="normal", fg_color="#10b981", hover_color="#059669",
+            text="✓ Open Created File", font=("", 13, "bold"))
+
+    def _handle_job_status(self, status: dict) -> None:
+        """Updates the UI from a job server status and keeps polling until the job ends."""
+        if "error" in status and "status" not in status:
+            self.display_error(f"Error: Job server rejected the job: {status['error']}")
+        elif status["status"] == STATUS_DONE:
+            self.show_generated_file(status["output_path"])
+        elif status["status"] == STATUS_FAILED:
+            self.display_error(status["error"] or "Error: Job failed.")
+        else:
+            self.console.set(f"Job {status['status']} on job server ...")
+            self.after(self.JOB_POLL_INTERVAL_MS, self._poll_job, status["id"])
+
+    def _poll_job(self, job_id: str) -> None:
+        """Polls the job server for the status of a submitted job."""
+        status: dict | None = get_job_status(job_id)
+        if status is None:
+            self.display_error("Error: Lost connection to the job server.")
+            return
+        self._handle_job_status(status)
+
     def validate_and_get_input(self, entry_name: str) -> float | None:
         """Validates and retrieves the value for the given entry name."""
         try:
@@ -263,11 +287,23 @@ class VariantGeneratorDemoApp(ctk.CTk):
 
     def display_error(self, message: str) -> None:
         """Displays error messages in the display box."""
-        self.display_box.delete("0.0", "end")
-        self.display_box.insert("0.0", message)
+        self.console.set(message)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Variant Generator Demo")
+    parser.add_argument("--profile", action="store_true",
+                        help="write cProfile and tracemalloc reports for each generation")
+    parser.add_argument("--checksum", type=checksum_argument, default=DEFAULT_CHECKSUMS,
+                        help="checksums stamped into the header, e.g. crc32,sha256")
+    parser.add_argument("--python-writer", action="store_true",
+                        help="write .mot files with the built-in writer instead of the batch file")
+    cli_args = parser.parse_args()
+    VariantGeneratorDemoApp.checksum_algorithms = cli_args.checksum
+    VariantGeneratorDemoApp.use_python_writer = cli_args.python_writer
+    configure_profiling(
+        cli_args.profile or profiling_enabled(),
+        os.path.dirname(os.path.abspath(VariantGeneratorDemoApp.LOG_FILE_NAME)))
     try:
         if not os.path.exists(VariantGeneratorDemoApp.LOG_FILE_NAME):
             with open(VariantGeneratorDemoApp.LOG_FILE_NAME, 'w') as f:
@@ -0,0 +1,163 @@
+"""
+Opt-in profiling of the generation paths.
+
+When profiling is enabled, every call wrapped with ``profiled`` runs under
+cProfile and tracemalloc and leaves two files in the output directory (next to
+``ChangeLog.txt`` by default):
+
+- ``profile_<label>_<timestamp>.prof`` - cProfile stats, open with ``pstats``
+  or snakeviz
+- ``profile_<label>_<timestamp>_alloc.txt`` - top-N allocation sites
+
+Profiling is enabled with the ``--profile`` command line flag, the
+``VARIANT_GENERATOR_PROFILE`` environment variable or the hidden GUI toggle.
+When it is disabled, a wrapped call only costs one boolean check.
+
+cProfile can only be active once per process, so while one session holds it,
+concurrent sessions (for example other job server workers) only record the
+allocation summary.
+"""
+import cProfile
+import functools
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Generator, TypeVar
+
+PROFILE_ENV_VAR: str = "VARIANT_GENERATOR_PROFILE"
+TOP_ALLOCATIONS: int = 25
+
+F = TypeVar("F", bound=Callable)
+
+_enabled: bool = os.environ.get(PROFILE_ENV_VAR, "").strip().lower() not in ("", "0", "false", "no")
+_output_dir: str = os.getcwd()
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users: int = 0
+_profiler_lock = threading.Lock()
+
+
+def configure(enabled: bool, output_dir: str | None = None) -> None:
+    """
+    Turn profiling on or off.
+
+    Args:
+        enabled (bool): Whether wrapped calls should be profiled
+        output_dir (str | None, optional): Directory for the profile files
+    """
+    global _enabled, _output_dir
+    _enabled = enabled
+    if output_dir is not None:
+        _output_dir = output_dir
+
+
+def is_enabled() -> bool:
+    """Return True if profiling is currently enabled."""
+    return _enabled
+
+
+def output_dir() -> str:
+    """Return the directory receiving the profile files."""
+    return _output_dir
+
+
+def _start_tracemalloc() -> None:
+    """Start tracemalloc, sharing it between concurrently profiled calls."""
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _start_profiler() -> cProfile.Profile | None:
+    """
+    Start cProfile unless another session or profiling tool is already active.
+
+    Returns:
+        cProfile.Profile | None: The running profiler, or None if it was skipped
+    """
+    if not _profiler_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiling tool outside this module is active
+        _profiler_lock.release()
+        return None
+    return profiler
+
+
+def _stop_tracemalloc() -> tracemalloc.Snapshot:
+    """Take an allocation snapshot and stop tracemalloc once the last user is done."""
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+        return snapshot
+
+
+@contextmanager
+def profile_session(label: str, output_dir: str | None = None,
+                    top_n: int = TOP_ALLOCATIONS) -> Generator[str, None, None]:
+    """
+    Profile the enclosed block unconditionally.
+
+    Args:
+        label (str): Name used in the output file names
+        output_dir (str | None, optional): Directory for the profile files
+        top_n (int, optional): Number of allocation sites in the summary
+
+    Yields:
+        str: Path prefix of the files that will be written; the .prof file is
+        only written if cProfile was available for this session
+    """
+    directory: str = output_dir or _output_dir
+    stamp: str = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    prefix: str = os.path.join(directory, f"profile_{label}_{stamp}")
+
+    profiler: cProfile.Profile | None = None
+    _start_tracemalloc()
+    try:
+        profiler = _start_profiler()
+        yield prefix
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _profiler_lock.release()
+        snapshot: tracemalloc.Snapshot = _stop_tracemalloc()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if profiler is not None:
+                profiler.dump_stats(f"{prefix}.prof")
+            with open(f"{prefix}_alloc.txt", "w") as f:
+                f.write(f"# Top {top_n} allocation sites for {label}\n")
+                if profiler is None:
+                    f.write("# cProfile skipped: another profiling session was active\n")
+                for stat in snapshot.statistics("lineno")[:top_n]:
+                    f.write(f"{stat}\n")
+            print(f"Profile written to {prefix}_alloc.txt")
+        except OSError as e:
+            print(f"Error writing profile {prefix}: {e}")
+
+
+def profiled(label: str) -> Callable[[F], F]:
+    """
+    Decorator profiling each call of the wrapped function while profiling is enabled.
+
+    Args:
+        label (str): Name used in the output file names
+    """
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with profile_session(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,232 @@
+"""
+Deterministic sharding of batch manifests across build agents.
+
+``assign_shards`` splits a manifest into N shards of roughly equal input size.
+Every agent computes the same assignment from the same manifest, so each one
+can run its shard independently. Afterwards ``merge_shards`` combines the
+per-shard output directories and their ChangeLog lines into one result set.
+
+Usage:
+    python sharding.py run --manifest jobs.json --shard 2/4 --output-dir shard-2
+    python sharding.py merge --manifest jobs.json --output-dir merged shard-1 shard-2 ...
+"""
+import argparse
+import os
+import shutil
+from dataclasses import dataclass, field
+
+from batch import (JOURNAL_FILE_NAME, STATE_DONE, BatchResult, BatchRunner,
+                   JobJournal, check_output_names, job_key, load_manifest,
+                   manifest_dir, verify_output)
+from changelog import add_line_to_file, read_lines
+from generator import (DEFAULT_CHECKSUMS, GenerationError, VariantJob,
+                       checksum_argument)
+from profiling import configure as configure_profiling
+from profiling import is_enabled as profiling_enabled
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    Parse a shard argument of the form ``i/N`` with ``1 <= i <= N``.
+
+    Raises:
+        GenerationError: If the value is malformed or out of range
+    """
+    try:
+        index_text, count_text = value.split("/")
+        index, count = int(index_text), int(count_text)
+    except ValueError as e:
+        raise GenerationError(f"Invalid shard {value!r}, expected i/N.") from e
+    if not 1 <= index <= count:
+        raise GenerationError(f"Invalid shard {value!r}, i must be between 1 and N.")
+    return index, count
+
+
+def _input_size(job: VariantJob) -> int:
+    """
+    Size of the job's EEP file.
+
+    Raises:
+        GenerationError: If the file does not exist, because an agent missing an
+            input would compute a different assignment than the others
+    """
+    try:
+        return os.path.getsize(job.eep_path)
+    except OSError as e:
+        raise GenerationError(f"Error reading {job.eep_path}: {e}") from e
+
+
+def assign_shards(jobs: list[VariantJob], count: int,
+                  base_dir: str | None = None) -> list[list[VariantJob]]:
+    """
+    Split jobs into ``count`` shards balanced by input file size.
+
+    Jobs are placed largest first onto the currently lightest shard. Ties are
+    broken by job key and shard index, so the result only depends on the set
+    of jobs and their input sizes, not on the manifest order.
+
+    Args:
+        jobs (list[VariantJob]): Jobs from the manifest
+        count (int): Number of shards
+        base_dir (str | None, optional): Manifest directory the job keys are relative to
+
+    Returns:
+        list[list[VariantJob]]: Jobs of each shard, in manifest order
+
+    Raises:
+        GenerationError: If any input file is missing
+    """
+    unique: list[VariantJob] = list(dict.fromkeys(jobs))
+    order: dict[VariantJob, int] = {job: position for position, job in enumerate(unique)}
+    sizes: dict[VariantJob, int] = {job: _input_size(job) for job in unique}
+    loads: list[int] = [0] * count
+    shards: list[list[VariantJob]] = [[] for _ in range(count)]
+    for job in sorted(unique, key=lambda job: (-sizes[job], job_key(job, base_dir))):
+        target: int = min(range(count), key=lambda index: (loads[index], index))
+        shards[target].append(job)
+        loads[target] += sizes[job]
+    return [sorted(shard, key=order.__getitem__) for shard in shards]
+
+
+def select_shard(jobs: list[VariantJob], index: int, count: int,
+                 base_dir: str | None = None) -> list[VariantJob]:
+    """Return the jobs of shard ``index`` (1-based) out of ``count``."""
+    return assign_shards(jobs, count, base_dir)[index - 1]
+
+
+@dataclass
+class MergeResult:
+    """Outcome of merging shard outputs."""
+
+    merged: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+
+
+def merge_shards(jobs: list[VariantJob], shard_dirs: list[str],
+                 output_dir: str, log_file: str,
+                 base_dir: str | None = None) -> MergeResult:
+    """
+    Combine the outputs of several shard runs.
+
+    For every manifest job the verified output recorded as done in one of the
+    shard journals is copied into ``output_dir``, and its ChangeLog line is
+    appended to ``log_file`` in manifest order. Lines already present in
+    ``log_file`` are not added again, so a merge can be repeated safely.
+
+    Args:
+        jobs (list[VariantJob]): Jobs from the manifest
+        shard_dirs (list[str]): Output directories of the shard runs
+        output_dir (str): Directory receiving the merged .mot files
+        log_file (str): ChangeLog file receiving the merged entries
+        base_dir (str | None, optional): Manifest directory the job keys are relative to
+
+    Returns:
+        MergeResult: Merged files and the jobs without a verified output
+
+    Raises:
+        GenerationError: If two jobs would be merged onto the same output file
+    """
+    # Refuse to merge two jobs onto one file instead of silently overwriting it
+    check_output_names(jobs)
+    by_key: dict[str, VariantJob] = {job_key(job, base_dir): job for job in dict.fromkeys(jobs)}
+    done: dict[str, tuple[str, dict]] = {}
+    for shard_dir in shard_dirs:
+        states: dict[str, dict] = JobJournal(
+            os.path.join(shard_dir, JOURNAL_FILE_NAME), base_dir=base_dir).load()
+        for key, record in states.items():
+            if record["state"] != STATE_DONE or key not in by_key:
+                continue
+            # Shard directories may have been copied from other agents
+            path: str = os.path.join(shard_dir, by_key[key].output_name)
+            if verify_output(path, record["size"], record.get("digest")):
+                done.setdefault(key, (path, record))
+
+    os.makedirs(output_dir, exist_ok=True)
+    logged: set[str] = read_lines(log_file)
+    result = MergeResult()
+    for job in dict.fromkeys(jobs):
+        found: tuple[str, dict] | None = done.get(job_key(job, base_dir))
+        if found is None:
+            result.missing.append(job.output_name)
+            continue
+        path, record = found
+        destination: str = os.path.join(output_dir, job.output_name)
+        if os.path.abspath(path) != os.path.abspath(destination):
+            shutil.copy2(path, destination)
+        log_entry: str = record.get("log_entry") or job.log_entry(record["checksum"])
+        if log_entry not in logged:
+            add_line_to_file(log_file, log_entry)
+            logged.add(log_entry)
+        result.merged.append(destination)
+    return result
+
+
+def main() -> None:
+    """Run one shard or merge shard outputs from the command line."""
+    project_dir: str = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Sharded batch variant generation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="generate the jobs of one shard")
+    run_parser.add_argument("--shard", required=True, help="shard i of N (1-based), e.g. 2/4")
+    run_parser.add_argument("--output-dir", required=True)
+    run_parser.add_argument("--log-file", default=None,
+                            help="ChangeLog fragment, defaults to <output-dir>/ChangeLog.txt")
+    run_parser.add_argument("--workers", type=int, default=4)
+    run_parser.add_argument("--processes", action="store_true",
+                            help="generate in worker processes sharing a mapped EEP image")
+    run_parser.add_argument("--python-writer", action="store_true",
+                            help="write .mot files with the built-in writer instead of the batch file")
+    run_parser.add_argument("--profile", action="store_true",
+                            help="write cProfile and tracemalloc reports for the run")
+
+    merge_parser = commands.add_parser("merge", help="combine the outputs of all shards")
+    merge_parser.add_argument("--output-dir", required=True)
+    merge_parser.add_argument("--log-file", default=os.path.join(project_dir, "ChangeLog.txt"))
+    merge_parser.add_argument("shard_dirs", nargs="+")
+
+    for sub_parser in (run_parser, merge_parser):
+        sub_parser.add_argument("--manifest", required=True)
+        sub_parser.add_argument("--checksum", type=checksum_argument, default=DEFAULT_CHECKSUMS)
+    args = parser.parse_args()
+
+    base_dir: str = manifest_dir(args.manifest)
+    try:
+        jobs: list[VariantJob] = load_manifest(args.manifest, args.checksum)
+        shard_jobs: list[VariantJob] | None = None
+        if args.command == "run":
+            shard: tuple[int, int] = parse_shard(args.shard)
+            shard_jobs = select_shard(jobs, *shard, base_dir=base_dir)
+    except GenerationError as e:
+        raise SystemExit(str(e))
+
+    if shard_jobs is not None:
+        log_file: str = args.log_file or os.path.join(args.output_dir, "ChangeLog.txt")
+        configure_profiling(args.profile or profiling_enabled(),
+                            os.path.dirname(os.path.abspath(log_file)))
+        runner = BatchRunner(project_dir, args.output_dir, log_file,
+                             workers=args.workers, processes=args.processes,
+                             python_writer=args.python_writer, base_dir=base_dir)
+        result: BatchResult = runner.run(shard_jobs)
+        print(f"Shard {shard[0]}/{shard[1]} completed: {len(result.completed)}, "
+              f"skipped: {len(result.skipped)}, failed: {len(result.failed)}")
+        for name, error in result.failed.items():
+            print(f"Failed {name}: {error}")
+        if result.failed:
+            raise SystemExit(1)
+        return
+
+    try:
+        merged: MergeResult = merge_shards(jobs, args.shard_dirs, args.output_dir,
+                                           args.log_file, base_dir)
+    except GenerationError as e:
+        raise SystemExit(str(e))
+    print(f"Merged: {len(merged.merged)}, missing: {len(merged.missing)}")
+    for name in merged.missing:
+        print(f"Missing {name}")
+    if merged.missing:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Zero-copy access to EEP images from generation worker processes.
+
+Passing the image bytes to a worker process would pickle and copy them once
+per job, which adds up when one EEP is stamped for every product in
+``id_map``. Instead workers receive only the job, whose ``eep_path`` names the
+image, and map the file read-only with ``mmap``. All workers then read the
+same pages from the OS page cache, so peak memory stays roughly constant in
+the number of variants; each job only allocates its own header and output
+records.
+
+Each job maps the image for its own duration only. Mapping the file again for
+the next job is cheap because its pages stay cached, and a worker keeps no
+EEP files locked on Windows between jobs. An EEP file must still not be
+truncated while a job is reading it: the worker would be killed by SIGBUS,
+and the batch run reports the remaining jobs as failed.
+"""
+import mmap
+import os
+from contextlib import ExitStack, contextmanager
+from typing import Generator
+
+from generator import GenerationError, VariantJob, generate_variant
+from profiling import profile_session
+
+
+@contextmanager
+def mapped_image(path: str) -> Generator[memoryview, None, None]:
+    """
+    Map an EEP file read-only for the duration of the block.
+
+    Args:
+        path (str): Path of the EEP file
+
+    Yields:
+        memoryview: Zero-copy view of the file content
+
+    Raises:
+        OSError: If the file cannot be opened or mapped
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map empty files
+            mapping: mmap.mmap | None = None
+        else:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapping is None:
+        yield memoryview(b"")
+        return
+    view = memoryview(mapping)
+    try:
+        yield view
+    finally:
+        try:
+            view.release()
+            mapping.close()
+        except BufferError:
+            # A traceback still holds a slice of the image, for example after a
+            # failed write; the mapping is closed once that slice is collected
+            pass
+
+
+def generate_in_worker(job: VariantJob, project_dir: str, work_dir: str,
+                       python_writer: bool = False,
+                       profile_dir: str | None = None) -> tuple[str, str]:
+    """
+    Process pool entry point generating one job from the mapped image.
+
+    Args:
+        job (VariantJob): The variant to generate
+        project_dir (str): Directory used to look up the batch file
+        work_dir (str): Directory receiving ``demo.mot``
+        python_writer (bool, optional): Use the built-in writer on Windows too
+        profile_dir (str | None, optional): Profile the job into this directory
+
+    Returns:
+        tuple[str, str]: Path of the generated file and its checksum text
+
+    Raises:
+        GenerationError: If the image cannot be mapped or the file generated
+    """
+    with ExitStack() as stack:
+        try:
+            payload: memoryview = stack.enter_context(mapped_image(job.eep_path))
+        except OSError as e:
+            raise GenerationError(f"Error reading {job.eep_path}: {e}") from e
+        if profile_dir is None:
+            return generate_variant(job, project_dir, work_dir, payload, python_writer)
+        # Profiling state is not inherited by worker processes, so the parent passes it in
+        with profile_session("batch_job", profile_dir):
+            return generate_variant(job, project_dir, work_dir, payload, python_writer)
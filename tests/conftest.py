@@ -9,6 +9,7 @@ import os
 import pytest
 from typing import Generator
 import customtkinter as ctk
+from console import OutputConsole
 from main import VariantGeneratorDemoApp
 
 
@@ -25,6 +26,7 @@ def mock_app() -> VariantGeneratorDemoApp:
     with patch.object(VariantGeneratorDemoApp, '__init__', lambda x: None):
         app: VariantGeneratorDemoApp = VariantGeneratorDemoApp()
         app.display_box = MagicMock()
+        app.console = OutputConsole(app.display_box)
         app.project_dir = os.getcwd()
         app.default_file_name = "VariantGenerator_Output.mot"
         app.eep_file_name = None
@@ -48,6 +50,7 @@ def full_app() -> VariantGeneratorDemoApp:
 
         # Set all required attributes
         app.display_box = MagicMock()
+        app.console = OutputConsole(app.display_box)
         app.location_box = MagicMock()
         app.button_open_file = MagicMock()
         app.variant_option_menu = MagicMock()
@@ -0,0 +1,157 @@
+"""Unit tests for resumable batch generation."""
+import json
+import os
+import pytest
+from batch import BatchRunner, JobJournal, job_key, load_manifest
+from generator import GenerationError, VariantJob
+
+
+@pytest.fixture
+def manifest(tmp_path) -> str:
+    """Create an EEP file and a manifest stamping it for three products."""
+    (tmp_path / "demo_appliance.eep").write_bytes(os.urandom(4096))
+    entries = [{"eep": "demo_appliance.eep", "product": name, "version": "1.2.3"}
+               for name in ("Smart Thermostat", "Smart Lighting Hub", "Smart Door Lock")]
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(entries))
+    return str(path)
+
+
+@pytest.fixture
+def runner(tmp_path) -> BatchRunner:
+    """Create a batch runner writing into a temporary output directory."""
+    return BatchRunner(str(tmp_path), str(tmp_path / "output"),
+                       str(tmp_path / "ChangeLog.txt"), workers=2)
+
+
+@pytest.mark.unit
+class TestLoadManifest:
+    """Test suite for manifest parsing."""
+
+    def test_products_are_mapped_to_ids(self, manifest: str) -> None:
+        """Test that product names resolve through id_map."""
+        jobs = load_manifest(manifest)
+        assert [job.product_id for job in jobs] == [1001, 1003, 1007]
+        assert jobs[0].version == "1.2.3"
+        assert os.path.isabs(jobs[0].eep_path)
+
+    def test_unknown_product_is_rejected(self, tmp_path) -> None:
+        """Test that unknown product names raise GenerationError."""
+        path = tmp_path / "bad.json"
+        path.write_text(json.dumps([{"eep": "x.eep", "product": "Toaster", "version": "1.0.0"}]))
+        with pytest.raises(GenerationError, match="Toaster"):
+            load_manifest(str(path))
+
+    def test_colliding_output_names_are_rejected(self, tmp_path) -> None:
+        """Test that two EEPs with the same basename cannot overwrite each other."""
+        path = tmp_path / "collide.json"
+        path.write_text(json.dumps([
+            {"eep": f"{folder}/fw.eep", "product": "Smart Thermostat", "version": "1.0.0"}
+            for folder in ("a", "b")]))
+        with pytest.raises(GenerationError, match="fw_1001_v1.0.0.mot"):
+            load_manifest(str(path))
+
+    def test_job_key_is_relative_to_manifest(self, tmp_path) -> None:
+        """Test that keys tell equal basenames apart but not checkout locations."""
+        first = VariantJob(str(tmp_path / "a" / "fw.eep"), 1001, 1, 0, 0)
+        second = VariantJob(str(tmp_path / "b" / "fw.eep"), 1001, 1, 0, 0)
+        assert job_key(first, str(tmp_path)) != job_key(second, str(tmp_path))
+        moved = VariantJob(str(tmp_path / "elsewhere" / "a" / "fw.eep"), 1001, 1, 0, 0)
+        assert job_key(moved, str(tmp_path / "elsewhere")) == job_key(first, str(tmp_path))
+
+
+@pytest.mark.integration
+class TestBatchRunner:
+    """Test suite for journaled batch runs."""
+
+    def test_second_run_skips_completed_jobs(self, manifest: str, runner: BatchRunner, tmp_path) -> None:
+        """Test that a resumed run redoes nothing when every output verifies."""
+        jobs = load_manifest(manifest)
+        first = runner.run(jobs)
+        assert len(first.completed) == 3 and not first.failed
+
+        second = runner.run(jobs)
+        assert second.completed == []
+        assert sorted(second.skipped) == sorted(first.completed)
+        assert len((tmp_path / "ChangeLog.txt").read_text().splitlines()) == 3
+
+    def test_resume_from_other_directory(self, manifest: str, tmp_path, monkeypatch) -> None:
+        """Test that a relative output directory is journaled as an absolute path."""
+        monkeypatch.chdir(tmp_path)
+        jobs = load_manifest(manifest)
+        BatchRunner(str(tmp_path), "output", str(tmp_path / "ChangeLog.txt"), workers=1).run(jobs)
+
+        monkeypatch.chdir(tmp_path.parent)
+        result = BatchRunner(str(tmp_path), str(tmp_path / "output"),
+                             str(tmp_path / "ChangeLog.txt"), workers=1).run(jobs)
+        assert result.completed == [] and len(result.skipped) == 3
+
+    def test_missing_changelog_line_is_restored(self, manifest: str, runner: BatchRunner, tmp_path) -> None:
+        """Test that a crash between journaling and logging neither loses nor duplicates lines."""
+        jobs = load_manifest(manifest)
+        runner.run(jobs)
+        log_file = tmp_path / "ChangeLog.txt"
+        lines = log_file.read_text().splitlines()
+        log_file.write_text("\n".join(lines[:-1]) + "\n")
+
+        result = runner.run(jobs)
+        assert result.completed == []
+        assert sorted(log_file.read_text().splitlines()) == sorted(lines)
+
+    def test_changed_output_is_regenerated(self, manifest: str, runner: BatchRunner) -> None:
+        """Test that an output that no longer verifies is queued again."""
+        jobs = load_manifest(manifest)
+        first = runner.run(jobs)
+        with open(first.completed[0], "a") as f:
+            f.write("corrupted\n")
+
+        second = runner.run(jobs)
+        assert second.completed == [first.completed[0]]
+        assert len(second.skipped) == 2
+
+    def test_same_size_corruption_is_regenerated(self, manifest: str, runner: BatchRunner) -> None:
+        """Test that a changed output of unchanged size fails the digest check."""
+        jobs = load_manifest(manifest)
+        first = runner.run(jobs)
+        with open(first.completed[0], "r+b") as f:
+            f.seek(-3, os.SEEK_END)
+            f.write(b"000")
+
+        second = runner.run(jobs)
+        assert second.completed == [first.completed[0]]
+
+    def test_interrupted_run_resumes_unfinished_jobs(self, manifest: str, runner: BatchRunner) -> None:
+        """Test that started-but-unfinished jobs and a torn journal line are redone."""
+        jobs = load_manifest(manifest)
+        runner.run(jobs[:1])
+        journal = JobJournal(runner.journal.path)
+        journal.open()
+        journal.record(jobs[1], "started")
+        journal.close()
+        with open(runner.journal.path, "a") as f:
+            f.write('{"key": "torn')
+
+        result = runner.run(jobs)
+        assert len(result.skipped) == 1
+        assert len(result.completed) == 2
+
+    def test_records_after_torn_line_are_loaded(self, manifest: str, runner: BatchRunner) -> None:
+        """Test that reopening the journal terminates a torn line before appending."""
+        jobs = load_manifest(manifest)
+        runner.run(jobs[:1])
+        with open(runner.journal.path, "a") as f:
+            f.write('{"key": "torn')
+
+        result = runner.run(jobs)
+        assert len(result.completed) == 2
+        third = runner.run(jobs)
+        assert third.completed == [] and len(third.skipped) == 3
+
+    def test_failed_job_is_recorded(self, manifest: str, runner: BatchRunner) -> None:
+        """Test that a missing EEP fails its job without stopping the batch."""
+        jobs = load_manifest(manifest)
+        os.remove(jobs[0].eep_path)
+        result = runner.run(jobs)
+        assert len(result.failed) == 3
+        states = JobJournal(runner.journal.path).load()
+        assert {record["state"] for record in states.values()} == {"failed"}
@@ -0,0 +1,54 @@
+"""Unit tests for the throttled output console."""
+from unittest.mock import MagicMock, call
+import pytest
+from console import OutputConsole
+
+
+@pytest.fixture
+def widget() -> MagicMock:
+    """Create a mock textbox."""
+    return MagicMock()
+
+
+@pytest.mark.unit
+@pytest.mark.ui
+class TestOutputConsole:
+    """Test suite for OutputConsole buffering and throttling."""
+
+    def test_first_update_is_written_immediately(self, widget: MagicMock) -> None:
+        """Test that an update after a quiet period replaces the content at once."""
+        OutputConsole(widget).set("Ready")
+        widget.delete.assert_called_once_with("0.0", "end")
+        widget.insert.assert_called_once_with("0.0", "Ready")
+        widget.after.assert_not_called()
+
+    def test_burst_is_coalesced_into_one_flush(self, widget: MagicMock) -> None:
+        """Test that updates within the interval are scheduled as a single append."""
+        console = OutputConsole(widget)
+        console.write("line 1")
+        for index in range(2, 6):
+            console.write(f"line {index}")
+        widget.after.assert_called_once()
+        assert widget.insert.call_count == 1
+
+        delay, callback = widget.after.call_args.args
+        assert 1 <= delay <= OutputConsole.FLUSH_INTERVAL_MS
+        callback()
+        widget.insert.assert_called_with("end", "\nline 2\nline 3\nline 4\nline 5")
+        widget.delete.assert_not_called()
+
+    def test_widget_is_trimmed_to_max_lines(self, widget: MagicMock) -> None:
+        """Test that the oldest lines are removed once the limit is reached."""
+        console = OutputConsole(widget, max_lines=3, interval_ms=0)
+        console.write("a\nb")
+        console.write("c\nd")
+        assert widget.delete.call_args == call("1.0", "2.0")
+
+    def test_buffer_overflow_redraws_latest_lines(self, widget: MagicMock) -> None:
+        """Test that more pending lines than fit in the buffer keep only the newest."""
+        console = OutputConsole(widget, max_lines=2)
+        console.write("first")
+        console.write("x\ny\nz")
+        widget.after.call_args.args[1]()
+        assert widget.delete.call_args == call("0.0", "end")
+        widget.insert.assert_called_with("0.0", "y\nz")
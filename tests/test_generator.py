@@ -0,0 +1,123 @@
+"""Unit tests for the headless generation helpers."""
+import argparse
+import hashlib
+import os
+import zlib
+import pytest
+import generator
+from generator import (GenerationError, VariantJob, build_command, checksum_argument,
+                       checksum_file, generate_variant, parse_checksums, write_mot_file)
+
+
+@pytest.fixture
+def eep_file(tmp_path) -> str:
+    """Create an EEP file spanning several read chunks."""
+    path = tmp_path / "demo_appliance.eep"
+    path.write_bytes(os.urandom(150_001))
+    return str(path)
+
+
+@pytest.mark.unit
+class TestVariantJob:
+    """Test suite for the job description."""
+
+    def test_identical_jobs_are_equal(self) -> None:
+        """Test that identical requests hash equal for deduplication."""
+        first = VariantJob("a.eep", 1001, 1, 2, 3)
+        assert first == VariantJob("a.eep", 1001, 1, 2, 3)
+        assert len({first, VariantJob("a.eep", 1001, 1, 2, 3)}) == 1
+
+    def test_unknown_checksum_is_rejected(self) -> None:
+        """Test that unsupported checksum names raise GenerationError."""
+        with pytest.raises(GenerationError):
+            VariantJob("a.eep", 1001, 1, 2, 3, checksums=("md5",))
+
+    def test_empty_checksums_are_rejected(self) -> None:
+        """Test that an empty checksum list from the API or a journal is rejected."""
+        data = {**VariantJob("a.eep", 1001, 1, 2, 3).to_dict(), "checksums": []}
+        with pytest.raises(GenerationError, match="At least one checksum"):
+            VariantJob.from_dict(data)
+
+    def test_round_trip_through_dict(self) -> None:
+        """Test that a job survives serialization for the job server."""
+        job = VariantJob(os.path.abspath("a.eep"), 1001, 1, 2, 3,
+                         checksums=("crc32", "sha256"))
+        assert VariantJob.from_dict(job.to_dict()) == job
+
+    def test_output_name_includes_non_default_checksums(self) -> None:
+        """Test that jobs differing only in checksums write different files."""
+        default = VariantJob("fw.eep", 1001, 1, 2, 3)
+        both = VariantJob("fw.eep", 1001, 1, 2, 3, checksums=("crc32", "sha256"))
+        assert default.output_name == "fw_1001_v1.2.3.mot"
+        assert both.output_name == "fw_1001_v1.2.3_crc32-sha256.mot"
+
+    def test_checksum_option_is_validated(self) -> None:
+        """Test that unknown checksum names are rejected when parsing options."""
+        assert parse_checksums("CRC32, sha256") == ("crc32", "sha256")
+        with pytest.raises(GenerationError):
+            parse_checksums("md5")
+        with pytest.raises(argparse.ArgumentTypeError):
+            checksum_argument("")
+
+    def test_build_command_passes_checksum(self) -> None:
+        """Test that the checksum is quoted for the batch file."""
+        job = VariantJob("demo.eep", 1001, 1, 2, 3)
+        command = build_command("writeheader.bat", job, "crc32:0000ABCD")
+        assert command.endswith('--revision 3 --checksum "crc32:0000ABCD"')
+
+
+@pytest.mark.unit
+class TestWriteMotFile:
+    """Test suite for the streaming .mot writer."""
+
+    def test_checksums_match_payload(self, eep_file: str, tmp_path) -> None:
+        """Test that CRC32 and SHA-256 are computed over the whole payload."""
+        payload = open(eep_file, "rb").read()
+        job = VariantJob(eep_file, 1003, 1, 0, 0, checksums=("crc32", "sha256"))
+        checksum = write_mot_file(job, str(tmp_path / "out.mot"))
+        assert checksum.hexdigest("crc32") == f"{zlib.crc32(payload):08X}"
+        assert checksum.hexdigest("sha256") == hashlib.sha256(payload).hexdigest().upper()
+        assert checksum.format() == checksum_file(eep_file, job.checksums).format()
+
+    def test_header_field_is_filled_in(self, eep_file: str, tmp_path) -> None:
+        """Test that the reserved header line carries the final checksum."""
+        out = tmp_path / "out.mot"
+        checksum = write_mot_file(VariantJob(eep_file, 1003, 1, 2, 3), str(out))
+        lines = out.read_text().splitlines()
+        assert lines[1] == "; Product ID: 1003"
+        assert lines[2] == "; Version: 1.2.3"
+        assert lines[4] == f"; Checksum: {checksum.format()}"
+        assert lines[-1] == "S70500000000FA"
+
+    def test_records_reproduce_payload(self, eep_file: str, tmp_path) -> None:
+        """Test that the S3 records contain the payload with valid checksums."""
+        out = tmp_path / "out.mot"
+        write_mot_file(VariantJob(eep_file, 1003, 1, 2, 3), str(out))
+        data = bytearray()
+        for line in out.read_text().splitlines():
+            if line.startswith("S3"):
+                body = bytes.fromhex(line[2:])
+                assert sum(body) & 0xFF == 0xFF
+                data += body[5:-1]
+        assert bytes(data) == open(eep_file, "rb").read()
+
+    def test_missing_eep_raises(self, tmp_path) -> None:
+        """Test that an unreadable source raises GenerationError without leaving output."""
+        job = VariantJob(str(tmp_path / "missing.eep"), 1003, 1, 2, 3)
+        with pytest.raises(GenerationError):
+            generate_variant(job, str(tmp_path), str(tmp_path), python_writer=True)
+        assert not os.path.exists(tmp_path / "demo.mot")
+
+    def test_non_ascii_eep_name(self, tmp_path) -> None:
+        """Test that non-ASCII EEP names do not break the ASCII header."""
+        path = tmp_path / "Prüfung.eep"
+        path.write_bytes(b"\x01\x02")
+        out = tmp_path / "out.mot"
+        write_mot_file(VariantJob(str(path), 1003, 1, 2, 3), str(out))
+        assert out.read_text().startswith("; Demo MOT file generated from Pr?fung.eep")
+
+    def test_missing_batch_file_on_windows(self, eep_file: str, tmp_path, monkeypatch) -> None:
+        """Test that Windows reports a missing batch file instead of switching writers."""
+        monkeypatch.setattr(generator.os, "name", "nt")
+        with pytest.raises(GenerationError, match="Batch file not found"):
+            generate_variant(VariantJob(eep_file, 1003, 1, 2, 3), str(tmp_path), str(tmp_path))
@@ -0,0 +1,149 @@
+"""Unit tests for the local job server and its client helpers."""
+import os
+import time
+from unittest.mock import MagicMock
+import pytest
+from generator import VariantJob
+from job_server import (STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING,
+                        JobQueue, JobServer, get_job_status, submit_job)
+
+
+def make_job(product_id: int = 1001) -> VariantJob:
+    """Create a variant job for an arbitrary EEP file."""
+    return VariantJob(eep_path=os.path.abspath("demo_appliance.eep"),
+                      product_id=product_id, major=1, minor=2, revision=3)
+
+
+def wait_for(job_id: str, port: int) -> dict:
+    """Poll the server until the job leaves the queued/running states."""
+    deadline: float = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        status: dict | None = get_job_status(job_id, port=port)
+        if status and status["status"] not in (STATUS_QUEUED, STATUS_RUNNING):
+            return status
+        time.sleep(0.02)
+    raise AssertionError("Job did not finish in time")
+
+
+@pytest.mark.unit
+class TestJobQueue:
+    """Test suite for the deduplicating priority queue."""
+
+    def test_identical_in_flight_jobs_are_deduplicated(self) -> None:
+        """Test that resubmitting an in-flight job returns the same job."""
+        jobs = JobQueue()
+        first = jobs.submit(make_job())
+        second = jobs.submit(make_job())
+        assert first is second
+
+    def test_finished_job_can_be_resubmitted(self) -> None:
+        """Test that the deduplication slot is released when a job ends."""
+        jobs = JobQueue()
+        first = jobs.submit(make_job())
+        jobs.finish(jobs.next_job(timeout=0), output_path="out.mot")
+        assert first.status == STATUS_DONE
+        assert jobs.submit(make_job()) is not first
+
+    def test_finished_jobs_expire(self) -> None:
+        """Test that finished jobs are dropped after their TTL but running ones stay."""
+        jobs = JobQueue(finished_ttl=0)
+        finished = jobs.submit(make_job(1001))
+        jobs.finish(jobs.next_job(timeout=0), output_path="out.mot")
+        running = jobs.submit(make_job(1002))
+        assert jobs.get(finished.job_id) is None
+        assert jobs.get(running.job_id) is running
+
+    def test_finished_jobs_are_capped(self) -> None:
+        """Test that only the newest finished jobs are kept beyond the cap."""
+        jobs = JobQueue(max_finished=2)
+        submitted = [jobs.submit(make_job(product_id)) for product_id in (1001, 1002, 1003)]
+        for _ in submitted:
+            jobs.finish(jobs.next_job(timeout=0), output_path="out.mot")
+        assert [jobs.get(job.job_id) for job in submitted] == [None, *submitted[1:]]
+
+    def test_jobs_run_in_priority_order(self) -> None:
+        """Test that lower priority values are taken first, FIFO otherwise."""
+        jobs = JobQueue()
+        low = jobs.submit(make_job(1001), priority=20)
+        high = jobs.submit(make_job(1002), priority=1)
+        also_low = jobs.submit(make_job(1003), priority=20)
+        order = [jobs.next_job(timeout=0) for _ in range(3)]
+        assert order == [high, low, also_low]
+        assert jobs.next_job(timeout=0) is None
+
+
+@pytest.mark.integration
+class TestJobServer:
+    """Test suite for the HTTP server and client helpers."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        """Start a server on a free port with a runner that writes a fake .mot file."""
+        def runner(spec: VariantJob, work_dir: str) -> tuple[str, str]:
+            if spec.product_id == 0:
+                raise RuntimeError("boom")
+            produced = os.path.join(work_dir, "demo.mot")
+            with open(produced, "w") as f:
+                f.write(f"; Product ID: {spec.product_id}\n")
+            return produced, "crc32:DEADBEEF"
+
+        server = JobServer(str(tmp_path), str(tmp_path / "output"),
+                           str(tmp_path / "ChangeLog.txt"), port=0, runner=runner)
+        server.start()
+        yield server
+        server.stop()
+
+    def test_submit_and_poll_until_done(self, server: JobServer, tmp_path) -> None:
+        """Test that a submitted job produces a uniquely named file and a log line."""
+        port: int = server.address[1]
+        status = submit_job(make_job(), port=port)
+        result = wait_for(status["id"], port)
+        assert result["status"] == STATUS_DONE
+        assert os.path.basename(result["output_path"]) == make_job().output_name
+        assert os.path.exists(result["output_path"])
+        log = (tmp_path / "ChangeLog.txt").read_text()
+        assert '--id 1001 --major 1 --minor 2 --revision 3 --checksum "crc32:DEADBEEF"' in log
+        assert result["checksum"] == "crc32:DEADBEEF"
+
+    def test_failed_job_reports_error(self, server: JobServer) -> None:
+        """Test that runner exceptions are reported as failed jobs."""
+        port: int = server.address[1]
+        status = submit_job(make_job(product_id=0), port=port)
+        result = wait_for(status["id"], port)
+        assert result["status"] == STATUS_FAILED
+        assert "boom" in result["error"]
+
+    def test_worker_survives_unexpected_errors(self, tmp_path) -> None:
+        """Test that an error escaping job processing fails the job, not the worker."""
+        server = JobServer(str(tmp_path), str(tmp_path / "output"),
+                           str(tmp_path / "ChangeLog.txt"), port=0, workers=1)
+        server._process = MagicMock(side_effect=[RuntimeError("profiler"), None])
+        server.start()
+        try:
+            port: int = server.address[1]
+            result = wait_for(submit_job(make_job(), port=port)["id"], port)
+            assert result["status"] == STATUS_FAILED
+            assert "profiler" in result["error"]
+            submit_job(make_job(1002), port=port)
+            deadline: float = time.monotonic() + 5
+            while server._process.call_count < 2 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert server._process.call_count == 2
+        finally:
+            server.stop()
+
+    def test_invalid_job_is_rejected(self, server: JobServer) -> None:
+        """Test that out-of-range versions are rejected with an error."""
+        job = VariantJob(eep_path="x.eep", product_id=1001,
+                         major=100, minor=0, revision=0)
+        status = submit_job(job, port=server.address[1])
+        assert "status" not in status
+        assert "Major" in status["error"]
+
+    def test_client_returns_none_without_server(self) -> None:
+        """Test that the client signals standalone mode when nothing listens."""
+        server = JobServer(".", "output", "log.txt", port=0)
+        port: int = server.address[1]
+        server.stop()
+        assert submit_job(make_job(), port=port) is None
+        assert get_job_status("missing", port=port) is None
@@ -107,3 +107,32 @@ class TestUIComponents:
         mock_app.display_box.insert.assert_called_once_with(
             "0.0", "Test error message"
         )
+
+
+@pytest.mark.unit
+class TestJobServerClient:
+    """Test suite for the job server thin client mode."""
+
+    def test_done_status_enables_open_button(self, full_app: VariantGeneratorDemoApp) -> None:
+        """Test that a finished server job is shown like a local generation."""
+        full_app._handle_job_status(
+            {"id": "abc", "status": "done", "output_path": "out.mot", "error": None})
+        assert full_app.generated_mot_path == "out.mot"
+        full_app.button_open_file.configure.assert_called_once()
+
+    def test_running_status_schedules_poll(self, full_app: VariantGeneratorDemoApp) -> None:
+        """Test that unfinished jobs are polled again."""
+        full_app.after = MagicMock()
+        full_app._handle_job_status(
+            {"id": "abc", "status": "running", "output_path": None, "error": None})
+        full_app.after.assert_called_once_with(
+            full_app.JOB_POLL_INTERVAL_MS, full_app._poll_job, "abc")
+
+    @patch("main.get_job_status", return_value=None)
+    def test_poll_reports_lost_server(
+        self, mock_status: MagicMock, full_app: VariantGeneratorDemoApp
+    ) -> None:
+        """Test error message when the server goes away while polling."""
+        full_app._poll_job("abc")
+        full_app.display_box.insert.assert_called_once_with(
+            "0.0", "Error: Lost connection to the job server.")
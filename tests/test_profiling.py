@@ -0,0 +1,66 @@
+"""Unit tests for the opt-in profiling hook."""
+import os
+import threading
+import tracemalloc
+import pytest
+import profiling
+from profiling import configure, profile_session, profiled
+
+
+@pytest.fixture(autouse=True)
+def restore_profiling():
+    """Reset the module level profiling state after each test."""
+    enabled, output_dir = profiling._enabled, profiling._output_dir
+    yield
+    configure(enabled, output_dir)
+
+
+@pytest.mark.unit
+class TestProfiling:
+    """Test suite for the profiling decorator and session."""
+
+    def test_disabled_writes_nothing(self, tmp_path) -> None:
+        """Test that wrapped calls run normally without profile output."""
+        configure(False, str(tmp_path))
+        assert profiled("noop")(lambda x: x * 2)(21) == 42
+        assert os.listdir(tmp_path) == []
+
+    def test_enabled_writes_prof_and_allocation_summary(self, tmp_path) -> None:
+        """Test that an enabled call leaves a .prof file and an allocation report."""
+        configure(True, str(tmp_path))
+        result = profiled("work")(lambda: [bytes(1024) for _ in range(10)])()
+        assert len(result) == 10
+        names = sorted(os.listdir(tmp_path))
+        assert len(names) == 2
+        assert names[0].startswith("profile_work_") and names[0].endswith(".prof")
+        assert names[1].endswith("_alloc.txt")
+
+    def test_session_writes_even_when_block_raises(self, tmp_path) -> None:
+        """Test that a failing run is still profiled."""
+        with pytest.raises(ValueError):
+            with profile_session("fail", str(tmp_path)) as prefix:
+                raise ValueError("boom")
+        assert os.path.exists(f"{prefix}.prof")
+
+    def test_concurrent_sessions_do_not_fail(self, tmp_path) -> None:
+        """Test that overlapping sessions share cProfile and release tracemalloc."""
+        inside = threading.Barrier(2)
+        errors: list[BaseException] = []
+
+        def run() -> None:
+            try:
+                with profile_session("job", str(tmp_path)):
+                    inside.wait(timeout=5)
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert not tracemalloc.is_tracing()
+        names = os.listdir(tmp_path)
+        assert len([name for name in names if name.endswith(".prof")]) == 1
+        assert len([name for name in names if name.endswith("_alloc.txt")]) == 2
@@ -0,0 +1,115 @@
+"""Unit tests for manifest sharding and shard merging."""
+import os
+import shutil
+import pytest
+from batch import BatchRunner
+from generator import GenerationError, VariantJob
+from sharding import assign_shards, merge_shards, parse_shard, select_shard
+
+
+@pytest.fixture
+def jobs(tmp_path) -> list[VariantJob]:
+    """Create jobs over EEP files of different sizes."""
+    result: list[VariantJob] = []
+    for name, size in (("small", 1_000), ("medium", 5_000), ("large", 12_000)):
+        path = tmp_path / f"{name}.eep"
+        path.write_bytes(os.urandom(size))
+        for product_id in (1001, 1002):
+            result.append(VariantJob(str(path), product_id, 1, 0, 0))
+    return result
+
+
+@pytest.mark.unit
+class TestAssignShards:
+    """Test suite for deterministic shard assignment."""
+
+    def test_parse_shard(self) -> None:
+        """Test parsing of 1-based i/N shard arguments."""
+        assert parse_shard("2/4") == (2, 4)
+        for value in ("0/4", "5/4", "two/4", "1"):
+            with pytest.raises(GenerationError):
+                parse_shard(value)
+
+    def test_every_job_in_exactly_one_shard(self, jobs: list[VariantJob]) -> None:
+        """Test that shards partition the manifest."""
+        shards = assign_shards(jobs, 3)
+        flat = [job for shard in shards for job in shard]
+        assert sorted(flat, key=jobs.index) == jobs
+
+    def test_assignment_ignores_manifest_order(self, jobs: list[VariantJob]) -> None:
+        """Test that every agent gets the same shard regardless of job order."""
+        for index in (1, 2, 3):
+            assert set(select_shard(jobs, index, 3)) == set(select_shard(jobs[::-1], index, 3))
+
+    def test_shards_balanced_by_input_size(self, jobs: list[VariantJob]) -> None:
+        """Test that the large jobs are spread instead of counted equally."""
+        loads = [sum(os.path.getsize(job.eep_path) for job in shard)
+                 for shard in assign_shards(jobs, 2)]
+        assert sorted(loads) == [18_000, 18_000]
+
+    def test_missing_input_fails_assignment(self, jobs: list[VariantJob]) -> None:
+        """Test that a missing EEP fails the shard run instead of counting as empty."""
+        os.remove(jobs[0].eep_path)
+        with pytest.raises(GenerationError, match="small.eep"):
+            select_shard(jobs, 1, 2)
+
+
+@pytest.mark.integration
+class TestMergeShards:
+    """Test suite for merging per-shard outputs."""
+
+    def test_merge_combines_outputs_and_changelog(self, jobs: list[VariantJob], tmp_path) -> None:
+        """Test that merged outputs and ChangeLog lines follow manifest order."""
+        shard_dirs: list[str] = []
+        for index in (1, 2):
+            shard_dir = str(tmp_path / f"agent-{index}" / "shard")
+            BatchRunner(str(tmp_path), shard_dir, os.path.join(shard_dir, "ChangeLog.txt"),
+                        workers=1, base_dir=str(tmp_path)).run(
+                select_shard(jobs, index, 2, base_dir=str(tmp_path)))
+            # Simulate collecting the shard directory from another agent
+            collected = str(tmp_path / f"collected-{index}")
+            shutil.copytree(shard_dir, collected)
+            shard_dirs.append(collected)
+
+        log_file = tmp_path / "ChangeLog.txt"
+        result = merge_shards(jobs, shard_dirs, str(tmp_path / "merged"), str(log_file),
+                              base_dir=str(tmp_path))
+        assert result.missing == []
+        assert [os.path.basename(path) for path in result.merged] == [job.output_name for job in jobs]
+        lines = log_file.read_text().splitlines()
+        assert [line.split("--content ")[1].split(" ")[0] for line in lines] == [
+            job.content for job in jobs]
+
+    def test_missing_shard_is_reported(self, jobs: list[VariantJob], tmp_path) -> None:
+        """Test that jobs of an absent shard are listed as missing."""
+        shard_dir = str(tmp_path / "shard-1")
+        BatchRunner(str(tmp_path), shard_dir, os.path.join(shard_dir, "ChangeLog.txt"),
+                    workers=1).run(select_shard(jobs, 1, 2))
+        result = merge_shards(jobs, [shard_dir], str(tmp_path / "merged"),
+                              str(tmp_path / "ChangeLog.txt"))
+        assert sorted(result.missing) == sorted(job.output_name for job in select_shard(jobs, 2, 2))
+
+    def test_repeated_merge_does_not_duplicate_changelog(self, jobs: list[VariantJob], tmp_path) -> None:
+        """Test that merging the same shards twice leaves the ChangeLog unchanged."""
+        shard_dir = str(tmp_path / "shard")
+        BatchRunner(str(tmp_path), shard_dir, os.path.join(shard_dir, "ChangeLog.txt"),
+                    workers=1).run(jobs)
+        log_file = tmp_path / "ChangeLog.txt"
+        merge_shards(jobs, [shard_dir], str(tmp_path / "merged"), str(log_file))
+        first = log_file.read_text()
+        result = merge_shards(jobs, [shard_dir], str(tmp_path / "merged"), str(log_file))
+        assert result.missing == []
+        assert log_file.read_text() == first
+        assert len(first.splitlines()) == len(jobs)
+
+    def test_merge_rejects_duplicate_destinations(self, tmp_path) -> None:
+        """Test that jobs sharing an output name fail the merge instead of overwriting."""
+        colliding: list[VariantJob] = []
+        for folder in ("a", "b"):
+            (tmp_path / folder).mkdir()
+            (tmp_path / folder / "fw.eep").write_bytes(os.urandom(100))
+            colliding.append(VariantJob(str(tmp_path / folder / "fw.eep"), 1001, 1, 0, 0))
+        with pytest.raises(GenerationError, match="fw_1001_v1.0.0.mot"):
+            merge_shards(colliding, [], str(tmp_path / "merged"),
+                         str(tmp_path / "ChangeLog.txt"), base_dir=str(tmp_path))
+        assert not (tmp_path / "merged").exists()
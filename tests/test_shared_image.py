@@ -0,0 +1,91 @@
+"""Unit tests for zero-copy image handoff to worker processes."""
+import os
+import pytest
+import generator
+from batch import BatchRunner
+from generator import GenerationError, VariantJob, write_mot_file
+from shared_image import generate_in_worker, mapped_image
+
+
+@pytest.fixture
+def eep_file(tmp_path) -> str:
+    """Create an EEP file spanning several chunks."""
+    path = tmp_path / "demo_appliance.eep"
+    path.write_bytes(os.urandom(200_000))
+    return str(path)
+
+
+def records(path: str) -> list[str]:
+    """Return the non-timestamp lines of a .mot file."""
+    with open(path) as f:
+        return [line for line in f if not line.startswith("; Generated:")]
+
+
+@pytest.mark.unit
+class TestMappedImage:
+    """Test suite for the per-job image mappings."""
+
+    def test_view_matches_file_and_is_released(self, eep_file: str) -> None:
+        """Test that the image is read without copying and released afterwards."""
+        with mapped_image(eep_file) as view:
+            assert view.readonly
+            assert view == open(eep_file, "rb").read()
+        with pytest.raises(ValueError):
+            len(view)
+
+    def test_empty_file(self, tmp_path) -> None:
+        """Test that empty images are supported."""
+        path = tmp_path / "empty.eep"
+        path.write_bytes(b"")
+        with mapped_image(str(path)) as view:
+            assert len(view) == 0
+
+    def test_mapped_payload_produces_identical_file(self, eep_file: str, tmp_path) -> None:
+        """Test that writing from the mapping equals streaming the file."""
+        job = VariantJob(eep_file, 1001, 1, 2, 3, checksums=("crc32", "sha256"))
+        write_mot_file(job, str(tmp_path / "streamed.mot"))
+        with mapped_image(eep_file) as view:
+            write_mot_file(job, str(tmp_path / "mapped.mot"), view)
+        assert records(str(tmp_path / "streamed.mot")) == records(str(tmp_path / "mapped.mot"))
+
+    def test_missing_image_raises_generation_error(self, tmp_path) -> None:
+        """Test that a missing EEP is reported like other generation errors."""
+        job = VariantJob(str(tmp_path / "missing.eep"), 1001, 1, 2, 3)
+        with pytest.raises(GenerationError):
+            generate_in_worker(job, str(tmp_path), str(tmp_path))
+
+    def test_write_error_does_not_poison_worker(self, eep_file: str, tmp_path, monkeypatch) -> None:
+        """Test that a failed write is reported and the next job maps the image again."""
+        srecord = generator._srecord
+        calls: list[int] = []
+
+        def failing_srecord(kind: str, *args) -> str:
+            calls.append(1)
+            if kind == "S3" and len(calls) > 100:
+                raise OSError(28, "No space left on device")
+            return srecord(kind, *args)
+
+        job = VariantJob(eep_file, 1001, 1, 2, 3)
+        monkeypatch.setattr(generator, "_srecord", failing_srecord)
+        with pytest.raises(GenerationError, match="No space left"):
+            generate_in_worker(job, str(tmp_path), str(tmp_path), python_writer=True)
+
+        monkeypatch.setattr(generator, "_srecord", srecord)
+        out_path, _ = generate_in_worker(job, str(tmp_path), str(tmp_path), python_writer=True)
+        assert os.path.getsize(out_path) > os.path.getsize(eep_file)
+
+
+@pytest.mark.integration
+class TestProcessBatch:
+    """Test suite for batch runs in worker processes."""
+
+    def test_every_product_from_one_image(self, eep_file: str, tmp_path) -> None:
+        """Test that worker processes generate all variants of one EEP."""
+        jobs = [VariantJob(eep_file, product_id, 1, 0, 0) for product_id in range(1001, 1009)]
+        runner = BatchRunner(str(tmp_path), str(tmp_path / "output"),
+                             str(tmp_path / "ChangeLog.txt"), workers=2, processes=True)
+        result = runner.run(jobs)
+        assert not result.failed
+        assert len(result.completed) == 8
+        checksums = {records(path)[3] for path in result.completed}
+        assert len(checksums) == 1